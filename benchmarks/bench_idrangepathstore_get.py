@@ -0,0 +1,73 @@
+#!/bin/python3
+"""Compare IDRangePathStore.get against the old padded-comparison search.
+
+Run with the package importable, e.g.:
+  PYTHONPATH=src python benchmarks/bench_idrangepathstore_get.py
+"""
+
+import random
+import timeit
+from pathlib import Path
+
+from vnmutils.idrangepathstore import IDRangePathStore
+
+APPIDS = 200
+RANGES_PER_APPID = 500
+LOOKUPS = 100_000
+
+
+def legacy_get(store: IDRangePathStore, key_id: str):
+  """The lookup as it was before segment keys were pre-normalized."""
+  def less_than_or_equal(v1, v2):
+    max_len = max(len(v1), len(v2))
+    return v1 + (0,) * (max_len - len(v1)) <= v2 + (0,) * (max_len - len(v2))
+  if key_id in store._plain:
+    return store._plain[key_id]
+  if ':' not in key_id:
+    return None
+  appid, segment = store._parse_id(key_id)
+  if appid not in store._ranges:
+    return None
+  ranges = store._ranges[appid].entries
+  left, right = 0, len(ranges)
+  while left < right:
+    mid = (left + right) // 2
+    if less_than_or_equal(ranges[mid][0], segment):
+      left = mid + 1
+    else:
+      right = mid
+  for i in range(max(0, left - 1), min(len(ranges), left + 1)):
+    lower, upper, path = ranges[i]
+    if less_than_or_equal(lower, segment) and less_than_or_equal(segment, upper):
+      return path
+  return None
+
+
+def build_store() -> IDRangePathStore:
+  store = IDRangePathStore()
+  for a in range(APPIDS):
+    appid = f"pli-tv-bu-vb-pc{a}"
+    for r in range(RANGES_PER_APPID):
+      store.add(f"{appid}:{r}.1", f"{appid}:{r}.20", Path(f"/vault/pc{a}/{r}.md"))
+  return store
+
+
+def main():
+  random.seed(0)
+  store = build_store()
+  ids = [
+    f"pli-tv-bu-vb-pc{random.randrange(APPIDS)}:"
+    f"{random.randrange(RANGES_PER_APPID)}.{random.randrange(25)}"
+    for _ in range(LOOKUPS)
+  ]
+  for key_id in ids[:1000]:
+    assert store.get(key_id) == legacy_get(store, key_id)
+  legacy = min(timeit.repeat(lambda: [legacy_get(store, i) for i in ids], number=1, repeat=3))
+  current = min(timeit.repeat(lambda: [store.get(i) for i in ids], number=1, repeat=3))
+  print(f"{LOOKUPS} lookups over {APPIDS * RANGES_PER_APPID} ranges")
+  print(f"  legacy padded search: {legacy:.3f}s")
+  print(f"  pre-normalized keys:  {current:.3f}s ({legacy / current:.1f}x)")
+
+
+if __name__ == "__main__":
+  main()
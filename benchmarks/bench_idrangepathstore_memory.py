@@ -0,0 +1,51 @@
+#!/bin/python3
+"""Compare the memory held by the default and compact IDRangePathStores.
+
+Run with the package importable, e.g.:
+  PYTHONPATH=src python benchmarks/bench_idrangepathstore_memory.py
+Tracing every allocation is slow, so expect this to take a few minutes.
+"""
+
+import gc
+import tracemalloc
+from pathlib import Path
+
+from vnmutils.idrangepathstore import CompactIDRangePathStore, IDRangePathStore
+
+APPIDS = 1_000
+RANGES_PER_APPID = 1_000
+RANGES_PER_FILE = 50
+
+
+def ranges():
+  for a in range(APPIDS):
+    appid = f"pli-tv-bu-vb-pc{a}"
+    for r in range(RANGES_PER_APPID):
+      yield (
+        f"{appid}:{r // 10}.{r % 10}.1",
+        f"{appid}:{r // 10}.{r % 10}.30",
+        Path(f"/vault/pc{a}/{r // RANGES_PER_FILE}.md"),
+      )
+
+
+def measure(store_class) -> int:
+  gc.collect()
+  tracemalloc.start()
+  store = store_class.from_ranges(ranges())
+  gc.collect()
+  size, _ = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+  assert store.get("pli-tv-bu-vb-pc7:3.4.5") == Path("/vault/pc7/0.md")
+  return size
+
+
+def main():
+  default = measure(IDRangePathStore)
+  compact = measure(CompactIDRangePathStore)
+  print(f"{APPIDS * RANGES_PER_APPID} ranges, {RANGES_PER_FILE} per file")
+  print(f"  IDRangePathStore:        {default / 2**20:7.1f} MiB")
+  print(f"  CompactIDRangePathStore: {compact / 2**20:7.1f} MiB ({1 - compact / default:.0%} smaller)")
+
+
+if __name__ == "__main__":
+  main()
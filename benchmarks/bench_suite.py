@@ -0,0 +1,307 @@
+#!/bin/python3
+"""Time the hot paths of vnmutils on synthetic, SuttaCentral-shaped data.
+
+Run with the package importable, e.g.:
+  PYTHONPATH=src python benchmarks/bench_suite.py --output results.json
+and later check a change against those results with:
+  PYTHONPATH=src python benchmarks/bench_suite.py --compare results.json
+which exits nonzero if anything got slower by more than --tolerance.
+
+All data is generated from --seed, so runs with the same arguments time
+exactly the same work.
+"""
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from vnmutils import mdutils, paliutils
+from vnmutils.idrangepathstore import CompactIDRangePathStore, IDRangePathStore
+from vnmutils.paliutils import PALI_ALPHABET, PALI_SUFFIXES, match_terms_to_root_text, sanitize, stem
+
+# Bump whenever what a benchmark times changes, so old results aren't compared
+RESULTS_VERSION = 2
+VAULT = Path("/vault")
+
+
+def synthetic_ranges(rng: random.Random, appids: int, ranges_per_appid: int) -> list[tuple[str, str, Path]]:
+  """Segment ranges shaped like the Vinaya's, plus a few plain IDs per appid."""
+  ranges = []
+  for a in range(appids):
+    appid = f"pli-tv-bu-vb-{rng.choice(['pj', 'ss', 'np', 'pc', 'pd', 'sk'])}{a}"
+    section, line = 1, 1
+    for r in range(ranges_per_appid):
+      if rng.random() < 0.2:
+        section, line = section + 1, 1
+      length = rng.randrange(1, 30)
+      path = VAULT / appid / f"{section}.md"
+      if r % 10 == 0:
+        ranges.append((f"{appid}:{section}.{line}", "", path))
+        line += 1
+        continue
+      ranges.append((f"{appid}:{section}.{line}", f"{appid}:{section}.{line + length}", path))
+      line += length + 1
+    ranges.append((appid, "", VAULT / appid / "index.md"))
+  return ranges
+
+
+def random_segment_ids(rng: random.Random, ranges: list[tuple[str, str, Path]], count: int) -> list[str]:
+  """IDs to look up: mostly within stored ranges, some just past them."""
+  ids = []
+  for _ in range(count):
+    lower, upper, _ = rng.choice(ranges)
+    if not upper or ':' not in lower:
+      ids.append(lower)
+      continue
+    appid, segment = lower.split(':')
+    section, line = segment.split('.')
+    ids.append(f"{appid}:{section}.{int(line) + rng.randrange(40)}")
+  return ids
+
+
+def synthetic_vault(
+  rng: random.Random,
+  folder: Path,
+  ranges: list[tuple[str, str, Path]],
+  files: int,
+  lines_per_file: int,
+  link_density: float,
+) -> int:
+  """Write markdown notes where roughly link_density of lines link to
+  SuttaCentral, a tenth of them to IDs which aren't stored.
+  Returns the number of links written."""
+  links = 0
+  words = "the monk should not do this as it is an offence entailing".split()
+  for f in range(files):
+    note = folder / f"notes{f % 20}" / f"note{f}.md"
+    note.parent.mkdir(parents=True, exist_ok=True)
+    lines = []
+    for _ in range(lines_per_file):
+      line = " ".join(rng.choice(words) for _ in range(12))
+      if rng.random() < link_density:
+        lower = rng.choice(ranges)[0]
+        if rng.random() < 0.1:
+          lower = "pli-tv-bu-vb-missing:1.1"
+        document, _, segment = lower.partition(':')
+        anchor = f"#{segment}" if segment else ""
+        line += f" See [{document}](https://suttacentral.net/{document}/en/brahmali{anchor})."
+        links += 1
+      lines.append(line)
+    note.write_text("\n".join(lines) + "\n", encoding="utf-8")
+  return links
+
+
+def synthetic_pali_words(rng: random.Random, count: int) -> list[str]:
+  """Inflected, sometimes capitalized and punctuated, Pali-looking words."""
+  suffixes = sorted(suffix for group in PALI_SUFFIXES for suffix in group)
+  consonants = [l for l in PALI_ALPHABET if l not in "aāiīuūeoṁ"]
+  vowels = ["a", "ā", "i", "ī", "u", "ū", "e", "o"]
+  words = []
+  for _ in range(count):
+    word = "".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randrange(1, 4)))
+    word += rng.choice(suffixes)
+    if rng.random() < 0.1:
+      word = word.capitalize()
+    if rng.random() < 0.2:
+      word += rng.choice([",", ".", "—", "ti", "”ti."])
+    words.append(word)
+  return words
+
+
+def synthetic_root_texts(
+  rng: random.Random, texts: int, lines_per_text: int, vocabulary: list[str],
+) -> list[tuple[list[list[str]], list[list[str]]]]:
+  """(terms, root_text) pairs where terms are runs of words taken, in order,
+  from the root text, as the Vibhaṅga's word commentary does."""
+  cases = []
+  while len(cases) < texts:
+    root_text = [
+      [rng.choice(vocabulary) for _ in range(rng.randrange(4, 16))]
+      for _ in range(lines_per_text)
+    ]
+    terms = []
+    for line in root_text:
+      start = 0
+      while start < len(line) and rng.random() < 0.7:
+        length = rng.randrange(1, 4)
+        terms.append(line[start:start + length])
+        start += length + rng.randrange(0, 3)
+    terms = [term for term in terms if term]
+    try:
+      match_terms_to_root_text(terms, root_text)
+    except Exception:
+      continue # The greedy matcher can trip over a repeated word; try again
+    cases.append((terms, root_text))
+  return cases
+
+
+def measure(run, repeat: int, operations: int, setup=None) -> dict:
+  """Time run() repeat times, calling setup() untimed before each."""
+  times = []
+  for _ in range(repeat):
+    if setup is not None:
+      setup()
+    start = time.perf_counter()
+    run()
+    times.append(time.perf_counter() - start)
+  best = min(times)
+  return {
+    "operations": operations,
+    "min_s": best,
+    "median_s": statistics.median(times),
+    "max_s": max(times),
+    "ops_per_s": operations / best if best else None,
+  }
+
+
+def run_benchmarks(args) -> dict:
+  rng = random.Random(args.seed)
+  appids = max(1, int(2000 * args.scale))
+  ranges = synthetic_ranges(rng, appids, 50)
+  shuffled = ranges[:]
+  rng.shuffle(shuffled)
+  ids = random_segment_ids(rng, ranges, int(100_000 * args.scale) or 1)
+  words = synthetic_pali_words(rng, int(50_000 * args.scale) or 1)
+  cases = synthetic_root_texts(rng, max(1, int(200 * args.scale)), 8, words[:2000])
+  term_count = sum(len(terms) for terms, _ in cases)
+  results = {}
+
+  def bench(name, run, operations, setup=None):
+    if args.only and not any(pattern in name for pattern in args.only):
+      return
+    results[name] = measure(run, args.repeat, operations, setup)
+    print(f"{name:48} {results[name]['min_s']:9.4f}s", file=sys.stderr)
+
+  for store_class in (IDRangePathStore, CompactIDRangePathStore):
+    prefix = store_class.__name__
+    def add_all():
+      store = store_class()
+      for lower, upper, path in shuffled:
+        store.add(lower, upper, path)
+    bench(f"{prefix}.add", add_all, len(shuffled))
+    bench(f"{prefix}.from_ranges", lambda: store_class.from_ranges(shuffled), len(shuffled))
+    store = store_class.from_ranges(ranges)
+    bench(f"{prefix}.get", lambda: [store.get(i) for i in ids], len(ids))
+    bench(f"{prefix}.get_many", lambda: store.get_many(ids), len(ids))
+    # Links in a vault point at the same segments over and over
+    repeated = ids[:len(ids) // 50 or 1] * 50
+    bench(f"{prefix}.get_repeated", lambda: [store.get(i) for i in repeated], len(repeated))
+    bench(f"{prefix}.get_many_repeated", lambda: store.get_many(repeated), len(repeated))
+    bench(f"{prefix}.to_json", lambda: store.to_json(VAULT), len(ranges))
+    json_data = store.to_json(VAULT)
+    bench(
+      f"{prefix}.load_data_from_json",
+      lambda: store_class().load_data_from_json(json_data, VAULT),
+      len(ranges),
+    )
+
+  bench("paliutils.sanitize", lambda: [sanitize(word) for word in words], len(words))
+  sanitized = [sanitize(word) for word in words]
+  bench("paliutils.stem", lambda: [stem(word) for word in sanitized], len(sanitized), stem.cache_clear)
+  def cold_normalization():
+    # synthetic_root_texts has already normalized every term once
+    paliutils._TERM_NORMALIZATIONS.clear()
+    stem.cache_clear()
+  bench(
+    "paliutils.match_terms_to_root_text",
+    lambda: [match_terms_to_root_text(terms, root_text) for terms, root_text in cases],
+    term_count,
+    cold_normalization,
+  )
+
+  links = 0
+  with tempfile.TemporaryDirectory() as tmp:
+    pristine = Path(tmp) / "pristine"
+    work = Path(tmp) / "work"
+    files = max(1, int(2000 * args.scale))
+    links = synthetic_vault(rng, pristine, ranges, files, 60, args.link_density)
+    mdutils.SCUID_SEGMENT_PATHS = IDRangePathStore.from_ranges(ranges)
+    def fresh_vault():
+      shutil.rmtree(work, ignore_errors=True)
+      shutil.copytree(pristine, work)
+      mdutils.clear_obsidian_link_cache()
+    bench(
+      "mdutils.rewrite_suttacentral_links_in_folder",
+      lambda: mdutils.rewrite_suttacentral_links_in_folder(work, workers=args.workers),
+      files,
+      fresh_vault,
+    )
+
+  return {
+    "version": RESULTS_VERSION,
+    "python": platform.python_version(),
+    "implementation": platform.python_implementation(),
+    "machine": platform.machine(),
+    "parameters": {
+      "seed": args.seed,
+      "scale": args.scale,
+      "repeat": args.repeat,
+      "link_density": args.link_density,
+      "workers": args.workers,
+      "appids": appids,
+      "ranges": len(ranges),
+      "lookups": len(ids),
+      "words": len(words),
+      "root_texts": len(cases),
+      "terms": term_count,
+      "links": links,
+    },
+    "results": results,
+  }
+
+
+def regressions(baseline: dict, current: dict, tolerance: float) -> list[str]:
+  """Benchmarks whose best time is more than tolerance slower than baseline's."""
+  if baseline.get("version") != current["version"]:
+    raise ValueError(f"Can only compare results of version {current['version']}")
+  before_parameters = baseline.get("parameters", {})
+  different = sorted(
+    name for name in before_parameters.keys() | current["parameters"].keys()
+    if before_parameters.get(name) != current["parameters"].get(name)
+  )
+  if different:
+    raise ValueError(f"Can only compare runs of the same workload, but these differ: {', '.join(different)}")
+  slower = []
+  for name, result in current["results"].items():
+    before = baseline.get("results", {}).get(name)
+    if before and result["min_s"] > before["min_s"] * (1 + tolerance):
+      slower.append(f"{name}: {before['min_s']:.4f}s -> {result['min_s']:.4f}s")
+  return slower
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--scale", type=float, default=1.0, help="multiply the size of every corpus")
+  parser.add_argument("--seed", type=int, default=0)
+  parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark; the best is reported")
+  parser.add_argument("--link-density", type=float, default=0.2,
+                      help="fraction of markdown lines with a suttacentral link")
+  parser.add_argument("--workers", type=int, default=1, help="processes for rewriting the vault")
+  parser.add_argument("--only", action="append", help="only run benchmarks whose name contains this")
+  parser.add_argument("--output", type=Path, help="write the JSON results here instead of stdout")
+  parser.add_argument("--compare", type=Path, help="JSON results of an earlier run to check against")
+  parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown when comparing")
+  args = parser.parse_args()
+
+  results = run_benchmarks(args)
+  output = json.dumps(results, indent=2)
+  if args.output:
+    args.output.write_text(output + "\n", encoding="utf-8")
+  else:
+    print(output)
+  if args.compare:
+    slower = regressions(json.loads(args.compare.read_text(encoding="utf-8")), results, args.tolerance)
+    for line in slower:
+      print(f"REGRESSION {line}", file=sys.stderr)
+    sys.exit(1 if slower else 0)
+
+
+if __name__ == "__main__":
+  main()
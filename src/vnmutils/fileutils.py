@@ -0,0 +1,34 @@
+#!/bin/python3
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+def _umask() -> int:
+  umask = os.umask(0)
+  os.umask(umask)
+  return umask
+
+def atomic_write_bytes(path: Path, data: bytes):
+  """Writes via a temporary file in the same folder so that
+  a crash can never leave path half written"""
+  if path.is_symlink():
+    # Replace what the link points to, not the link itself
+    path = path.resolve()
+  fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+  try:
+    with os.fdopen(fd, 'wb') as f:
+      f.write(data)
+      # So the data is on disk before the rename which publishes it
+      f.flush()
+      os.fsync(f.fileno())
+    if path.exists():
+      shutil.copymode(path, tmp)
+    else:
+      # mkstemp makes files owner-only, unlike open
+      os.chmod(tmp, 0o666 & ~_umask())
+    os.replace(tmp, path)
+  except BaseException:
+    os.unlink(tmp)
+    raise
@@ -1,21 +1,300 @@
 #!/bin/python3
 from pathlib import Path
-from typing import Optional, Tuple
+from array import array
+from operator import itemgetter
+from typing import Iterable, Optional, Tuple, Union
 import bisect
+import hashlib
 import json
+import mmap
+import struct
+import threading
 
 # Written by Claude.ai Opus 4 and then modified by hand
 
+def _segment_key(segment: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Normalize a segment so that native tuple comparison matches the
+    zero-padded comparison of segments (i.e. 1.0 == 1 and 1 < 1.0.5)."""
+    end = len(segment)
+    while end and segment[end - 1] == 0:
+        end -= 1
+    return segment if end == len(segment) else segment[:end]
+
+
+class _AppRanges:
+    """The sorted, non-overlapping ranges stored under a single appid."""
+
+    key = staticmethod(_segment_key)
+
+    def __init__(self):
+        # Bounds normalized by _segment_key, kept parallel to entries so that
+        # lookups are plain bisects over native tuple comparisons
+        self.lower_keys: list[tuple[int, ...]] = []
+        self.upper_keys: list[tuple[int, ...]] = []
+        # (lower_segment, upper_segment, path) as originally given
+        self.entries: list[tuple[tuple[int, ...], tuple[int, ...], Path]] = []
+
+    def insert(self, index: int, lower: Tuple[int, ...], upper: Tuple[int, ...], path: Path) -> None:
+        self.lower_keys.insert(index, _segment_key(lower))
+        self.upper_keys.insert(index, _segment_key(upper))
+        self.entries.insert(index, (lower, upper, path))
+
+    def append(self, lower: Tuple[int, ...], upper: Tuple[int, ...], path: Path) -> None:
+        self.insert(len(self.entries), lower, upper, path)
+
+    def entry(self, index: int) -> Tuple[Tuple[int, ...], Tuple[int, ...], Path]:
+        return self.entries[index]
+
+    def path(self, index: int) -> Path:
+        return self.entries[index][2]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def copy(self) -> "_AppRanges":
+        copy = _AppRanges()
+        copy.lower_keys = self.lower_keys.copy()
+        copy.upper_keys = self.upper_keys.copy()
+        copy.entries = self.entries.copy()
+        return copy
+
+
+class _PathTable:
+    """Interned Paths, each stored once and referred to by index."""
+    __slots__ = ('paths', 'indexes')
+
+    def __init__(self):
+        self.paths: list[Path] = []
+        self.indexes: dict[Path, int] = {}
+
+    def index(self, path: Path) -> int:
+        index = self.indexes.get(path)
+        if index is None:
+            index = self.indexes[path] = len(self.paths)
+            self.paths.append(path)
+        return index
+
+
+class _CompactAppRanges:
+    """
+    Array-backed equivalent of _AppRanges.
+    
+    Each bound is packed into a single int: its normalized parts, padded to
+    the widest bound seen so far and to a fixed number of bits per part, then
+    shifted left by one. Query keys which fall strictly between two stored
+    values set that low bit so they still compare correctly. Widening either
+    dimension re-packs the whole appid, which is rare once a text is loaded.
+    """
+    __slots__ = (
+        'paths', 'width', 'bits',
+        'lower_keys', 'upper_keys', 'lower_lengths', 'upper_lengths', 'path_indexes',
+    )
+
+    def __init__(self, paths: _PathTable):
+        self.paths = paths
+        self.width = 0
+        self.bits = 1
+        self.lower_keys = array('Q')
+        self.upper_keys = array('Q')
+        self.lower_lengths = array('B')
+        self.upper_lengths = array('B')
+        self.path_indexes = array('I')
+
+    def key(self, segment: Tuple[int, ...]) -> int:
+        key = _segment_key(segment)
+        beyond = 0
+        if len(key) > self.width:
+            # The dropped parts end in a nonzero, so this is past key[:width]
+            key = key[:self.width]
+            beyond = 1
+        limit = (1 << self.bits) - 1
+        for i, part in enumerate(key):
+            if part >= limit:
+                # Greater than any stored part here, so the rest doesn't matter
+                key = key[:i] + (limit,)
+                break
+        return self._pack(key) | beyond
+
+    def insert(self, index: int, lower: Tuple[int, ...], upper: Tuple[int, ...], path: Path) -> None:
+        lower_key = _segment_key(lower)
+        upper_key = _segment_key(upper)
+        self._fit(lower_key, upper_key)
+        self.lower_keys.insert(index, self._pack(lower_key))
+        self.upper_keys.insert(index, self._pack(upper_key))
+        self.lower_lengths.insert(index, len(lower))
+        self.upper_lengths.insert(index, len(upper))
+        self.path_indexes.insert(index, self.paths.index(path))
+
+    def append(self, lower: Tuple[int, ...], upper: Tuple[int, ...], path: Path) -> None:
+        self.insert(len(self.path_indexes), lower, upper, path)
+
+    def entry(self, index: int) -> Tuple[Tuple[int, ...], Tuple[int, ...], Path]:
+        return (
+            self._unpack(self.lower_keys[index], self.lower_lengths[index]),
+            self._unpack(self.upper_keys[index], self.upper_lengths[index]),
+            self.paths.paths[self.path_indexes[index]],
+        )
+
+    def path(self, index: int) -> Path:
+        return self.paths.paths[self.path_indexes[index]]
+
+    def __len__(self) -> int:
+        return len(self.path_indexes)
+
+    def __iter__(self):
+        return (self.entry(i) for i in range(len(self.path_indexes)))
+
+    def copy(self) -> "_CompactAppRanges":
+        # The path table is only ever appended to, so it can be shared
+        copy = _CompactAppRanges(self.paths)
+        copy.width = self.width
+        copy.bits = self.bits
+        for column in ('lower_keys', 'upper_keys', 'lower_lengths', 'upper_lengths', 'path_indexes'):
+            setattr(copy, column, getattr(self, column)[:])
+        return copy
+
+    def _pack(self, key: Tuple[int, ...]) -> int:
+        packed = 0
+        for part in key:
+            packed = packed << self.bits | part
+        return packed << (self.bits * (self.width - len(key)) + 1)
+
+    def _unpack(self, packed: int, length: int) -> Tuple[int, ...]:
+        mask = (1 << self.bits) - 1
+        packed >>= 1
+        parts = [0] * max(self.width, length)
+        for i in range(self.width - 1, -1, -1):
+            parts[i] = packed & mask
+            packed >>= self.bits
+        return tuple(parts[:length])
+
+    def _fit(self, *keys: Tuple[int, ...]) -> None:
+        """Widen the packing if needed so that keys can be stored."""
+        width = max(self.width, *(len(key) for key in keys))
+        # Leave room for one value greater than every stored part
+        bits = max(self.bits, *((max(key, default=0) + 1).bit_length() for key in keys))
+        if width == self.width and bits == self.bits:
+            return
+        entries = list(self)
+        self.width = width
+        self.bits = bits
+        keys_type = (lambda values: array('Q', values)) if width * bits < 64 else list
+        self.lower_keys = keys_type(self._pack(_segment_key(lower)) for lower, _, _ in entries)
+        self.upper_keys = keys_type(self._pack(_segment_key(upper)) for _, upper, _ in entries)
+
+
+# Binary snapshot layout (all integers are little-endian uint32 unless noted):
+#   header:    magic, string count, string table offset, group count, group directory offset
+#   groups:    per appid, its plain entries (id string, path string)
+#              followed by its ranges (uint8 lower length, uint8 upper length,
+#              lower parts, upper parts, path string). Parts are uint16 unless
+#              the high bit of the lower length is set, in which case they're uint32
+#   directory: per appid (name string, plain offset, plain count, ranges offset, ranges count)
+#   strings:   string count + 1 offsets into a blob of deduplicated UTF-8 strings
+_SNAPSHOT_MAGIC = b"VNMIDRS1"
+_SNAPSHOT_HEADER = struct.Struct("<8sIIII")
+_SNAPSHOT_GROUP = struct.Struct("<IIIII")
+_SNAPSHOT_PLAIN = struct.Struct("<II")
+_SNAPSHOT_LENGTHS = struct.Struct("<BB")
+_SNAPSHOT_WIDE = 0x80
+_UINT32 = struct.Struct("<I")
+
+
+class _Snapshot:
+    """Read-only view of a binary snapshot which decodes strings on demand."""
+
+    def __init__(self, buffer, paths_relative_to: Path):
+        magic, self.string_count, self.strings_offset, group_count, groups_offset = \
+            _SNAPSHOT_HEADER.unpack_from(buffer, 0)
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError("Not an IDRangePathStore snapshot")
+        self.buffer = buffer
+        self.blob_offset = self.strings_offset + _UINT32.size * (self.string_count + 1)
+        self.paths_relative_to = paths_relative_to
+        self._paths: list[Optional[Path]] = [None] * self.string_count
+        # appid -> (plain offset, plain count, ranges offset, ranges count)
+        self.groups: dict[str, tuple[int, int, int, int]] = {}
+        for i in range(group_count):
+            name, *group = _SNAPSHOT_GROUP.unpack_from(buffer, groups_offset + i * _SNAPSHOT_GROUP.size)
+            self.groups[self.string(name)] = tuple(group)
+
+    def string(self, index: int) -> str:
+        start, end = struct.unpack_from("<II", self.buffer, self.strings_offset + _UINT32.size * index)
+        return str(self.buffer[self.blob_offset + start:self.blob_offset + end], "utf-8")
+
+    def path(self, index: int) -> Path:
+        path = self._paths[index]
+        if path is None:
+            path = self._paths[index] = self.paths_relative_to.joinpath(self.string(index))
+        return path
+
+
+class LookupStats:
+    """
+    Counts of the lookups made through an IDRangePathStore's get and get_many.
+    
+    Plain lookups are of IDs without a segment (e.g. "pli-tv-bu-vb-pj1"),
+    which can only be stored on their own. Range lookups are of IDs with a
+    segment, which are found either stored on their own or within a range.
+    Only lookups made in this process are counted.
+    """
+    __slots__ = ('plain_hits', 'plain_misses', 'range_hits', 'range_misses')
+    
+    def __init__(self):
+        self.plain_hits = 0
+        self.plain_misses = 0
+        self.range_hits = 0
+        self.range_misses = 0
+    
+    @property
+    def hits(self) -> int:
+        return self.plain_hits + self.range_hits
+    
+    @property
+    def misses(self) -> int:
+        return self.plain_misses + self.range_misses
+    
+    def as_dict(self) -> dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __repr__(self) -> str:
+        return f"LookupStats({', '.join(f'{k}={v}' for k, v in self.as_dict().items())})"
+
+
 class IDRangePathStore:
     """Store Paths keyed by SuttaCentral IDs which may be segment ranges."""
     
     def __init__(self):
-        # Dictionary mapping appid to list of (lower_segment, upper_segment, path) tuples
+        # Dictionary mapping appid to its ranges
         # Kept sorted by lower_segment for efficient binary search
-        self._ranges: dict[str, list[tuple[tuple[int, ...], tuple[int, ...], Path]]] = {}
+        self._ranges: dict[str, _AppRanges] = {}
         self._plain: dict[str, Path] = {}
+        # appids still waiting to be decoded from self._snapshot
+        self._snapshot: Optional[_Snapshot] = None
+        self._pending: dict[str, tuple[int, int, int, int]] = {}
+        # Indexes built on first use and then kept up to date by add()
+        # Plain IDs with a segment, per appid, as sorted keys and parallel IDs
+        self._points: Optional[dict[str, tuple[list[tuple[int, ...]], list[str]]]] = None
+        # Path -> [(lower_id, upper_id), ...] for everything stored under it
+        self._by_path: Optional[dict[Path, list[tuple[str, str]]]] = None
+        # Cached result of fingerprint(), cleared whenever the data changes
+        self._fingerprint: Optional[str] = None
+        self._changed_since_snapshot = False
+        # Set to a LookupStats to have get() and get_many() count lookups
+        self.stats: Optional[LookupStats] = None
+    
+    def __getstate__(self):
+        # Snapshots may be backed by an mmap which can't be pickled
+        self._load_all_pending()
+        state = self.__dict__.copy()
+        state["_snapshot"] = None
+        return state
     
     def to_json(self, paths_relative_to: Path) -> str:
+        self._load_all_pending()
         return json.dumps({
             "ranges": {
                 appid: [
@@ -37,17 +316,103 @@ class IDRangePathStore:
     def load_data_from_json(self, json_data: str, paths_relative_to: Path) -> None:
         """WARNING: Overwrites existing data and does no validation!"""
         data = json.loads(json_data)
-        self._ranges = {
-            appid: [
-                (self._string_to_segment(lower), self._string_to_segment(upper), paths_relative_to.joinpath(path))
-                for lower, upper, path in ranges
-            ]
-            for appid, ranges in data["ranges"].items()
-        }
+        self._snapshot = None
+        self._pending = {}
+        self._ranges = {}
+        for appid, ranges in data["ranges"].items():
+            app_ranges = self._ranges[appid] = self._new_app_ranges()
+            for lower, upper, path in ranges:
+                app_ranges.append(
+                    self._string_to_segment(lower),
+                    self._string_to_segment(upper),
+                    paths_relative_to.joinpath(path),
+                )
         self._plain = {
-            id_str: paths_relative_to.joinpath(path)
+            id_str: self._intern_path(paths_relative_to.joinpath(path))
             for id_str, path in data["plain"].items()
         }
+        self._points = None
+        self._by_path = None
+        self._fingerprint = None
+    
+    def to_snapshot(self, paths_relative_to: Path) -> bytes:
+        """
+        Serialize the store into the compact binary format read by
+        load_data_from_snapshot and open_snapshot.
+        
+        Segments are packed as integers and path strings are deduplicated.
+        """
+        self._load_all_pending()
+        strings: dict[str, int] = {}
+        def intern(string: str) -> int:
+            return strings.setdefault(string, len(strings))
+        def intern_path(path: Path) -> int:
+            return intern(str(path.relative_to(paths_relative_to)))
+        
+        plain_by_appid: dict[str, list[tuple[str, Path]]] = {}
+        for id_str, path in self._plain.items():
+            plain_by_appid.setdefault(id_str.partition(':')[0], []).append((id_str, path))
+        
+        body = bytearray(_SNAPSHOT_HEADER.size)
+        directory = bytearray()
+        for appid in sorted(plain_by_appid.keys() | self._ranges.keys()):
+            plain = plain_by_appid.get(appid, [])
+            plain_offset = len(body)
+            for id_str, path in plain:
+                body += _SNAPSHOT_PLAIN.pack(intern(id_str), intern_path(path))
+            entries = self._ranges.get(appid, ())
+            ranges_offset = len(body)
+            for lower, upper, path in entries:
+                if max(lower + upper) > 0xFFFF:
+                    body += _SNAPSHOT_LENGTHS.pack(len(lower) | _SNAPSHOT_WIDE, len(upper))
+                    body += struct.pack(f"<{len(lower) + len(upper)}I", *lower, *upper)
+                else:
+                    body += _SNAPSHOT_LENGTHS.pack(len(lower), len(upper))
+                    body += struct.pack(f"<{len(lower) + len(upper)}H", *lower, *upper)
+                body += _UINT32.pack(intern_path(path))
+            directory += _SNAPSHOT_GROUP.pack(intern(appid), plain_offset, len(plain), ranges_offset, len(entries))
+        
+        groups_offset = len(body)
+        body += directory
+        strings_offset = len(body)
+        encoded = [string.encode("utf-8") for string in strings]
+        end = 0
+        body += _UINT32.pack(end)
+        for string in encoded:
+            end += len(string)
+            body += _UINT32.pack(end)
+        body += b"".join(encoded)
+        _SNAPSHOT_HEADER.pack_into(
+            body, 0, _SNAPSHOT_MAGIC, len(strings), strings_offset,
+            len(directory) // _SNAPSHOT_GROUP.size, groups_offset,
+        )
+        return bytes(body)
+    
+    def load_data_from_snapshot(self, buffer, paths_relative_to: Path) -> None:
+        """
+        Load a snapshot from any bytes-like buffer (e.g. an mmap).
+        
+        Each appid is only decoded the first time it is looked up or
+        modified, so the buffer must stay valid for the life of the store.
+        WARNING: Overwrites existing data and does no validation!
+        """
+        self._snapshot = _Snapshot(buffer, paths_relative_to)
+        self._changed_since_snapshot = False
+        self._pending = dict(self._snapshot.groups)
+        self._ranges = {}
+        self._plain = {}
+        self._points = None
+        self._by_path = None
+        self._fingerprint = None
+    
+    @classmethod
+    def open_snapshot(cls, snapshot_file: Union[str, Path], paths_relative_to: Path) -> "IDRangePathStore":
+        """Memory-map a file written from to_snapshot and return a store backed by it."""
+        with open(snapshot_file, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        store = cls()
+        store.load_data_from_snapshot(buffer, paths_relative_to)
+        return store
     
     def add(self, lower_id: str, upper_id: str, path: Path) -> None:
         """
@@ -61,53 +426,67 @@ class IDRangePathStore:
         Raises:
             ValueError: If range is invalid or overlaps with existing range
         """
-        if ":" not in lower_id or lower_id == upper_id or not upper_id:
-            self._plain[lower_id] = path
+        if self._pending:
+            self._load_pending(lower_id.partition(':')[0])
+        self._fingerprint = None
+        self._changed_since_snapshot = True
+        if self._is_plain(lower_id, upper_id):
+            self._set_plain(lower_id, path)
             return
-        lower_appid, lower_segment = self._parse_id(lower_id)
-        upper_appid, upper_segment = self._parse_id(upper_id)
+        appid, lower_segment, upper_segment = self._parse_range(lower_id, upper_id)
         
-        if lower_appid != upper_appid:
-            raise ValueError(f"App IDs must match: {lower_appid} != {upper_appid}")
+        ranges = self._ranges.get(appid)
+        if ranges is None:
+            ranges = self._ranges[appid] = self._new_app_ranges()
+        lower_key = ranges.key(lower_segment)
+        upper_key = ranges.key(upper_segment)
         
-        if not self._segment_less_than_or_equal(lower_segment, upper_segment):
-            raise ValueError(f"Lower segment must be <= upper segment: {lower_id} > {upper_id}")
+        # Find where this range would be inserted
+        insert_pos = bisect.bisect_left(ranges.lower_keys, lower_key)
         
-        # Check for overlaps with existing ranges
-        if lower_appid in self._ranges:
-            ranges = self._ranges[lower_appid]
-            
-            # Find where this range would be inserted
-            insert_pos = bisect.bisect_left(ranges, (lower_segment, upper_segment, None))
-            
-            # Check the range before the insertion point (if exists)
-            if insert_pos > 0:
-                prev_lower, prev_upper, _ = ranges[insert_pos - 1]
-                if self._segment_less_than_or_equal(prev_lower, upper_segment) and \
-                   self._segment_less_than_or_equal(lower_segment, prev_upper):
-                    raise ValueError(
-                        f"Range {lower_id}-{upper_id} overlaps with existing range "
-                        f"{lower_appid}:{self._segment_to_string(prev_lower)}-"
-                        f"{lower_appid}:{self._segment_to_string(prev_upper)}"
-                    )
-            
-            # Check the range at the insertion point (if exists)
-            if insert_pos < len(ranges):
-                next_lower, next_upper, _ = ranges[insert_pos]
-                if self._segment_less_than_or_equal(lower_segment, next_upper) and \
-                   self._segment_less_than_or_equal(next_lower, upper_segment):
-                    raise ValueError(
-                        f"Range {lower_id}-{upper_id} overlaps with existing range "
-                        f"{lower_appid}:{self._segment_to_string(next_lower)}-"
-                        f"{lower_appid}:{self._segment_to_string(next_upper)}"
-                    )
+        # Check the range before the insertion point (if exists)
+        if insert_pos > 0 and lower_key <= ranges.upper_keys[insert_pos - 1]:
+            raise self._overlap_error(lower_id, upper_id, appid, ranges.entry(insert_pos - 1))
         
-        # Add the new range, keeping the list sorted
-        if lower_appid not in self._ranges:
-            self._ranges[lower_appid] = []
+        # Check the range at the insertion point (if exists)
+        if insert_pos < len(ranges) and ranges.lower_keys[insert_pos] <= upper_key:
+            raise self._overlap_error(lower_id, upper_id, appid, ranges.entry(insert_pos))
         
         # Insert in sorted order by lower_segment
-        bisect.insort(self._ranges[lower_appid], (lower_segment, upper_segment, path))
+        ranges.insert(insert_pos, lower_segment, upper_segment, path)
+        if self._by_path is not None:
+            self._by_path.setdefault(ranges.path(insert_pos), []).append((lower_id, upper_id))
+    
+    @classmethod
+    def from_ranges(cls, ranges: Iterable[Tuple[str, str, Path]]) -> "IDRangePathStore":
+        """
+        Build a new store from many (lower_id, upper_id, path) triples at once.
+        
+        Equivalent to calling add() for each triple, but each appid's ranges
+        are sorted once and checked for overlaps in a single linear sweep
+        instead of being inserted one at a time.
+            
+        Raises:
+            ValueError: If a range is invalid or overlaps with another range
+        """
+        store = cls()
+        grouped: dict[str, list[tuple[tuple[int, ...], str, str, tuple[int, ...], tuple[int, ...], Path]]] = {}
+        for lower_id, upper_id, path in ranges:
+            if store._is_plain(lower_id, upper_id):
+                store._set_plain(lower_id, path)
+                continue
+            appid, lower_segment, upper_segment = store._parse_range(lower_id, upper_id)
+            grouped.setdefault(appid, []).append(
+                (_segment_key(lower_segment), lower_id, upper_id, lower_segment, upper_segment, path)
+            )
+        for appid, group in grouped.items():
+            group.sort(key=itemgetter(0))
+            app_ranges = store._ranges[appid] = store._new_app_ranges()
+            for _, lower_id, upper_id, lower_segment, upper_segment, path in group:
+                if app_ranges.upper_keys and app_ranges.key(lower_segment) <= app_ranges.upper_keys[-1]:
+                    raise store._overlap_error(lower_id, upper_id, appid, app_ranges.entry(-1))
+                app_ranges.append(lower_segment, upper_segment, path)
+        return store
     
     def get(self, key_id: str) -> Optional[Path]:
         """
@@ -119,35 +498,286 @@ class IDRangePathStore:
         Returns:
             Path object if ID is within a stored range, None otherwise
         """
+        if self._pending:
+            self._load_pending(key_id.partition(':')[0])
+        stats = self.stats
         if key_id in self._plain:
+            if stats is not None:
+                if ':' in key_id:
+                    stats.range_hits += 1
+                else:
+                    stats.plain_hits += 1
             return self._plain[key_id]
         if ':' not in key_id:
+            if stats is not None:
+                stats.plain_misses += 1
             return None
         appid, segment = self._parse_id(key_id)
         
-        if appid not in self._ranges:
-            return None
+        ranges = self._ranges.get(appid)
+        if ranges is not None:
+            # Find the rightmost range whose lower bound is <= segment
+            # Ranges never overlap, so that is the only one which could match
+            key = ranges.key(segment)
+            i = bisect.bisect_right(ranges.lower_keys, key) - 1
+            if i >= 0 and key <= ranges.upper_keys[i]:
+                if stats is not None:
+                    stats.range_hits += 1
+                return ranges.path(i)
         
-        # Binary search for the range that might contain this segment
-        ranges = self._ranges[appid]
+        if stats is not None:
+            stats.range_misses += 1
+        return None
+    
+    def get_many(self, ids: Iterable[str]) -> list[Optional[Path]]:
+        """
+        Get the Paths for many IDs at once, in the order they were given.
+        
+        Each distinct ID is looked up only once, so this is about as fast as
+        calling get() for each ID when they're all different and much faster
+        when they repeat, as the links in a vault do.
+        
+        Args:
+            ids: IDs to search for (e.g., ["app:1.5.0", "app:1.6"])
+            
+        Returns:
+            A list with, for each ID, what get() would have returned
+        """
+        ids = list(ids)
+        found: dict[str, Optional[Path]] = {}
+        plain = self._plain
+        all_ranges = self._ranges
+        bisect_right = bisect.bisect_right
+        for key_id in ids:
+            if key_id in found:
+                continue
+            appid, colon, segment_str = key_id.partition(':')
+            if self._pending:
+                self._load_pending(appid)
+            path = plain.get(key_id)
+            if path is None and colon:
+                try:
+                    segment = tuple(map(int, segment_str.split('.')))
+                except ValueError:
+                    raise ValueError(f"Invalid ID format: {key_id}")
+                ranges = all_ranges.get(appid)
+                if ranges is not None:
+                    key = ranges.key(segment)
+                    i = bisect_right(ranges.lower_keys, key) - 1
+                    if i >= 0 and key <= ranges.upper_keys[i]:
+                        path = ranges.path(i)
+            found[key_id] = path
+        results = list(map(found.__getitem__, ids))
+        
+        if self.stats is not None:
+            self._count_lookups(ids, results)
+        return results
+    
+    def overlapping(self, lower_id: str, upper_id: str) -> list[tuple[str, str, Path]]:
+        """
+        Find everything stored which intersects a span of IDs.
+        
+        Args:
+            lower_id: Lower bound ID of the span (e.g., "app:1.1")
+            upper_id: Upper bound ID of the span (e.g., "app:2.1.18")
+            
+        Returns:
+            (lower_id, upper_id, path) for each stored range or segment ID
+            intersecting the span, in segment order. Segment IDs stored on
+            their own have lower_id == upper_id.
+            
+        Raises:
+            ValueError: If the span is invalid
+        """
+        appid, lower_segment, upper_segment = self._parse_range(lower_id, upper_id)
+        if self._pending:
+            self._load_pending(appid)
+        found: list[tuple[tuple[int, ...], str, str, Path]] = []
         
-        # Find the rightmost range whose lower bound is <= segment
-        left, right = 0, len(ranges)
-        while left < right:
-            mid = (left + right) // 2
-            if self._segment_less_than_or_equal(ranges[mid][0], segment):
-                left = mid + 1
+        ranges = self._ranges.get(appid)
+        if ranges:
+            # Ranges never overlap, so both their bounds are sorted
+            start = bisect.bisect_left(ranges.upper_keys, ranges.key(lower_segment))
+            end = bisect.bisect_right(ranges.lower_keys, ranges.key(upper_segment))
+            for i in range(start, end):
+                lower, upper, path = ranges.entry(i)
+                found.append((
+                    _segment_key(lower),
+                    f"{appid}:{self._segment_to_string(lower)}",
+                    f"{appid}:{self._segment_to_string(upper)}",
+                    path,
+                ))
+        
+        if self._points is None:
+            self._build_points()
+        if appid in self._points:
+            keys, ids = self._points[appid]
+            start = bisect.bisect_left(keys, _segment_key(lower_segment))
+            end = bisect.bisect_right(keys, _segment_key(upper_segment))
+            for i in range(start, end):
+                found.append((keys[i], ids[i], ids[i], self._plain[ids[i]]))
+        
+        found.sort(key=itemgetter(0))
+        return [entry[1:] for entry in found]
+    
+    def ranges_for_path(self, path: Path) -> list[tuple[str, str]]:
+        """
+        Get everything stored under a path, e.g. to generate backlinks.
+        
+        Returns:
+            (lower_id, upper_id) for each range or ID associated with path,
+            with lower_id == upper_id for IDs that were stored on their own
+        """
+        if self._by_path is None:
+            self._load_all_pending()
+            by_path: dict[Path, list[tuple[str, str]]] = {}
+            for id_str, plain_path in self._plain.items():
+                by_path.setdefault(plain_path, []).append((id_str, id_str))
+            for appid, ranges in self._ranges.items():
+                for lower, upper, range_path in ranges:
+                    by_path.setdefault(range_path, []).append((
+                        f"{appid}:{self._segment_to_string(lower)}",
+                        f"{appid}:{self._segment_to_string(upper)}",
+                    ))
+            self._by_path = by_path
+        return list(self._by_path.get(path, ()))
+    
+    def fingerprint(self) -> str:
+        """
+        A hex digest which changes whenever the stored data does.
+        
+        Use it to tell whether anything derived from a store needs to be
+        recomputed. A store opened from a snapshot and not yet modified just
+        hashes the snapshot, without decoding it.
+        """
+        if self._fingerprint is not None:
+            return self._fingerprint
+        digest = hashlib.sha256()
+        if self._snapshot is not None and not self._changed_since_snapshot:
+            digest.update(b"snapshot\0")
+            digest.update(str(self._snapshot.paths_relative_to).encode("utf-8"))
+            digest.update(self._snapshot.buffer)
+        else:
+            self._load_all_pending()
+            for appid in sorted(self._ranges):
+                for lower, upper, path in self._ranges[appid]:
+                    digest.update(
+                        f"{appid}:{self._segment_to_string(lower)}\0"
+                        f"{appid}:{self._segment_to_string(upper)}\0{path}\0".encode("utf-8")
+                    )
+            for id_str in sorted(self._plain):
+                digest.update(f"{id_str}\0{self._plain[id_str]}\0".encode("utf-8"))
+        self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+    
+    def _count_lookups(self, ids: list[str], results: list[Optional[Path]]) -> None:
+        stats = self.stats
+        for key_id, result in zip(ids, results):
+            if ':' in key_id:
+                if result is None:
+                    stats.range_misses += 1
+                else:
+                    stats.range_hits += 1
+            elif result is None:
+                stats.plain_misses += 1
             else:
-                right = mid
+                stats.plain_hits += 1
+    
+    def _set_plain(self, id_str: str, path: Path) -> None:
+        path = self._intern_path(path)
+        old_path = self._plain.get(id_str)
+        self._plain[id_str] = path
+        if self._by_path is not None:
+            if old_path is not None:
+                self._by_path[old_path].remove((id_str, id_str))
+            self._by_path.setdefault(path, []).append((id_str, id_str))
+        if self._points is not None and old_path is None:
+            self._add_point(id_str)
+    
+    def _build_points(self) -> None:
+        # Only published once complete, for ConcurrentIDRangePathStore's readers
+        points: dict[str, tuple[list[tuple[int, ...]], list[str]]] = {}
+        for id_str in self._plain:
+            self._add_point(id_str, points)
+        self._points = points
+    
+    def _add_point(self, id_str: str, points: Optional[dict] = None) -> None:
+        if ':' not in id_str:
+            return
+        try:
+            appid, segment = self._parse_id(id_str)
+        except ValueError:
+            return # Not something a span of segments can cover
+        if points is None:
+            points = self._points
+        keys, ids = points.setdefault(appid, ([], []))
+        key = _segment_key(segment)
+        i = bisect.bisect_right(keys, key)
+        keys.insert(i, key)
+        ids.insert(i, id_str)
+    
+    def _load_pending(self, appid: str) -> None:
+        """Decode appid's entries from the snapshot if that hasn't happened yet."""
+        group = self._pending.pop(appid, None)
+        if group is None:
+            return
+        snapshot = self._snapshot
+        buffer = snapshot.buffer
+        plain_offset, plain_count, ranges_offset, ranges_count = group
+        for i in range(plain_count):
+            id_index, path_index = _SNAPSHOT_PLAIN.unpack_from(buffer, plain_offset + i * _SNAPSHOT_PLAIN.size)
+            self._set_plain(snapshot.string(id_index), snapshot.path(path_index))
+        if not ranges_count:
+            return
+        ranges = self._new_app_ranges()
+        offset = ranges_offset
+        for _ in range(ranges_count):
+            lower_length, upper_length = _SNAPSHOT_LENGTHS.unpack_from(buffer, offset)
+            offset += _SNAPSHOT_LENGTHS.size
+            part, part_size = "H", 2
+            if lower_length & _SNAPSHOT_WIDE:
+                lower_length &= ~_SNAPSHOT_WIDE
+                part, part_size = "I", 4
+            count = lower_length + upper_length
+            values = struct.unpack_from(f"<{count}{part}I", buffer, offset)
+            offset += count * part_size + _UINT32.size
+            ranges.append(values[:lower_length], values[lower_length:-1], snapshot.path(values[-1]))
+        self._ranges[appid] = ranges
+    
+    def _load_all_pending(self) -> None:
+        for appid in list(self._pending):
+            self._load_pending(appid)
+    
+    def _new_app_ranges(self):
+        return _AppRanges()
+    
+    def _intern_path(self, path: Path) -> Path:
+        return path
+    
+    def _is_plain(self, lower_id: str, upper_id: str) -> bool:
+        """Whether add() should store this as a single ID rather than a range."""
+        return ":" not in lower_id or lower_id == upper_id or not upper_id
+    
+    def _parse_range(self, lower_id: str, upper_id: str) -> Tuple[str, Tuple[int, ...], Tuple[int, ...]]:
+        """Parse and validate the bounds of a range into appid and segments."""
+        lower_appid, lower_segment = self._parse_id(lower_id)
+        upper_appid, upper_segment = self._parse_id(upper_id)
         
-        # Check the found range and the one before it
-        for i in range(max(0, left - 1), min(len(ranges), left + 1)):
-            lower, upper, path = ranges[i]
-            if (self._segment_less_than_or_equal(lower, segment) and 
-                self._segment_less_than_or_equal(segment, upper)):
-                return path
+        if lower_appid != upper_appid:
+            raise ValueError(f"App IDs must match: {lower_appid} != {upper_appid}")
         
-        return None
+        if _segment_key(upper_segment) < _segment_key(lower_segment):
+            raise ValueError(f"Lower segment must be <= upper segment: {lower_id} > {upper_id}")
+        
+        return lower_appid, lower_segment, upper_segment
+    
+    def _overlap_error(self, lower_id: str, upper_id: str, appid: str, existing) -> ValueError:
+        existing_lower, existing_upper, _ = existing
+        return ValueError(
+            f"Range {lower_id}-{upper_id} overlaps with existing range "
+            f"{appid}:{self._segment_to_string(existing_lower)}-"
+            f"{appid}:{self._segment_to_string(existing_upper)}"
+        )
     
     def _parse_id(self, id_str: str) -> Tuple[str, Tuple[int, ...]]:
         """Parse an ID into appid and segment tuple."""
@@ -158,21 +788,194 @@ class IDRangePathStore:
         except (ValueError, AttributeError):
             raise ValueError(f"Invalid ID format: {id_str}")
     
-    def _segment_less_than_or_equal(self, v1: Tuple[int, ...], v2: Tuple[int, ...]) -> bool:
-        """Compare two segment tuples."""
-        # Pad shorter segment with zeros for comparison
-        max_len = max(len(v1), len(v2))
-        v1_padded = v1 + (0,) * (max_len - len(v1))
-        v2_padded = v2 + (0,) * (max_len - len(v2))
-        return v1_padded <= v2_padded
-    
     def _segment_to_string(self, segment: Tuple[int, ...]) -> str:
         """Convert segment tuple back to string."""
         return '.'.join(str(v) for v in segment)
     
     def _string_to_segment(self, segment_str: str) -> Tuple[int, ...]:
         """Convert string to segment tuple."""
-        return tuple(int(part) for part in segment_str.split('.'))
+        return tuple(map(int, segment_str.split('.')))
+
+
+class CompactIDRangePathStore(IDRangePathStore):
+    """
+    An IDRangePathStore which trades a little lookup speed for memory.
+    
+    Each appid's bounds are kept in array-backed columns of packed ints and
+    every distinct Path is stored once, with ranges referring to it by index.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._paths = _PathTable()
+    
+    def load_data_from_json(self, json_data: str, paths_relative_to: Path) -> None:
+        self._paths = _PathTable()
+        super().load_data_from_json(json_data, paths_relative_to)
+    
+    def load_data_from_snapshot(self, buffer, paths_relative_to: Path) -> None:
+        self._paths = _PathTable()
+        super().load_data_from_snapshot(buffer, paths_relative_to)
+    
+    def _new_app_ranges(self):
+        return _CompactAppRanges(self._paths)
+    
+    def _intern_path(self, path: Path) -> Path:
+        return self._paths.paths[self._paths.index(path)]
+
+
+class ConcurrentIDRangePathStore:
+    """
+    A store which many threads can read while others are still adding to it.
+    
+    The data lives in an IDRangePathStore (or subclass) which is never
+    modified once published. Writers take a lock, copy just the parts they
+    change, and publish the result with a single attribute assignment, so
+    readers never take a lock and never see a half-updated list.
+    
+    Each add() copies the ranges of one appid (or the plain IDs), so use
+    add_many() to publish a batch at once. Snapshots are decoded in full
+    when loaded, and the indexes behind overlapping() and ranges_for_path()
+    are rebuilt on first use after each write.
+    """
+    
+    def __init__(self, store_class: type = IDRangePathStore):
+        self._store_class = store_class
+        self._lock = threading.Lock()
+        self._current: IDRangePathStore = store_class()
+    
+    def __getstate__(self):
+        return {"_store_class": self._store_class, "_current": self._current}
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    @property
+    def stats(self) -> Optional[LookupStats]:
+        """
+        Counts of the lookups made, if set to a LookupStats.
+        
+        Readers update the counts without a lock, so with several threads
+        reading at once some lookups may go uncounted.
+        """
+        return self._current.stats
+    
+    @stats.setter
+    def stats(self, stats: Optional[LookupStats]) -> None:
+        with self._lock:
+            # Published stores never change, so publish a copy instead
+            current = self._current
+            store = current.__class__.__new__(current.__class__)
+            store.__dict__.update(current.__dict__)
+            store.stats = stats
+            self._current = store
+    
+    def current(self) -> IDRangePathStore:
+        """
+        The data as of now, for a consistent view across several lookups.
+        
+        It will never change, so it must not be modified either.
+        """
+        return self._current
+    
+    def to_json(self, paths_relative_to: Path) -> str:
+        return self._current.to_json(paths_relative_to)
+    
+    def load_data_from_json(self, json_data: str, paths_relative_to: Path) -> None:
+        """WARNING: Overwrites existing data and does no validation!"""
+        store = self._store_class()
+        store.load_data_from_json(json_data, paths_relative_to)
+        self._publish(store)
+    
+    def to_snapshot(self, paths_relative_to: Path) -> bytes:
+        return self._current.to_snapshot(paths_relative_to)
+    
+    def load_data_from_snapshot(self, buffer, paths_relative_to: Path) -> None:
+        """WARNING: Overwrites existing data and does no validation!"""
+        store = self._store_class()
+        store.load_data_from_snapshot(buffer, paths_relative_to)
+        store._load_all_pending()
+        self._publish(store)
+    
+    @classmethod
+    def open_snapshot(
+        cls, snapshot_file: Union[str, Path], paths_relative_to: Path, store_class: type = IDRangePathStore,
+    ) -> "ConcurrentIDRangePathStore":
+        """Read a file written from to_snapshot and return a store with its data."""
+        with open(snapshot_file, "rb") as f:
+            buffer = f.read()
+        store = cls(store_class)
+        store.load_data_from_snapshot(buffer, paths_relative_to)
+        return store
+    
+    @classmethod
+    def from_ranges(
+        cls, ranges: Iterable[Tuple[str, str, Path]], store_class: type = IDRangePathStore,
+    ) -> "ConcurrentIDRangePathStore":
+        store = cls(store_class)
+        store._publish(store_class.from_ranges(ranges))
+        return store
+    
+    def add(self, lower_id: str, upper_id: str, path: Path) -> None:
+        """
+        Add a new range with associated path. See IDRangePathStore.add
+        
+        Raises:
+            ValueError: If range is invalid or overlaps with existing range
+        """
+        self.add_many([(lower_id, upper_id, path)])
+    
+    def add_many(self, ranges: Iterable[Tuple[str, str, Path]]) -> None:
+        """
+        Add many (lower_id, upper_id, path) triples and publish them together.
+        
+        Raises:
+            ValueError: If a range is invalid or overlaps with another range,
+                in which case none of them are added
+        """
+        with self._lock:
+            current = self._current
+            store = current.__class__.__new__(current.__class__)
+            store.__dict__.update(current.__dict__)
+            store._ranges = dict(current._ranges)
+            store._points = None
+            store._by_path = None
+            store._fingerprint = None
+            copied_plain = False
+            copied: set[str] = set()
+            for lower_id, upper_id, path in ranges:
+                if store._is_plain(lower_id, upper_id):
+                    if not copied_plain:
+                        store._plain = dict(current._plain)
+                        copied_plain = True
+                else:
+                    appid = lower_id.partition(':')[0]
+                    if appid not in copied and appid in store._ranges:
+                        store._ranges[appid] = store._ranges[appid].copy()
+                    copied.add(appid)
+                store.add(lower_id, upper_id, path)
+            self._current = store
+    
+    def get(self, key_id: str) -> Optional[Path]:
+        return self._current.get(key_id)
+    
+    def get_many(self, ids: Iterable[str]) -> list[Optional[Path]]:
+        return self._current.get_many(ids)
+    
+    def overlapping(self, lower_id: str, upper_id: str) -> list[tuple[str, str, Path]]:
+        return self._current.overlapping(lower_id, upper_id)
+    
+    def ranges_for_path(self, path: Path) -> list[tuple[str, str]]:
+        return self._current.ranges_for_path(path)
+    
+    def fingerprint(self) -> str:
+        return self._current.fingerprint()
+    
+    def _publish(self, store: IDRangePathStore) -> None:
+        with self._lock:
+            store.stats = self._current.stats
+            self._current = store
 
 
 # Example usage and tests by Gemini 2.5 Pro
@@ -199,15 +1002,41 @@ if __name__ == "__main__":
     print('✅ Get "foo:3.1" (upper bound of 2-part segment) -> OK')
     assert store.get("bar:1.0") == p4
     print('✅ Get "bar:1.0" (single-segment range) -> OK')
+    assert store.get("foo:3.1.0") == p3
+    print('✅ Get "foo:3.1.0" (zero-padded upper bound) -> OK')
+    assert store.get("pli-tv-bu-vb-pc4:1.1.7.0.1") == p2
+    print('✅ Get "pli-tv-bu-vb-pc4:1.1.7.0.1" (just past the lower bound) -> OK')
 
     print("\n--- Testing unsuccessful gets ---")
     assert store.get("foo:4.0") is None
     print('✅ Get "foo:4.0" (out of range high) -> OK')
     assert store.get("foo:1.49") is None
     print('✅ Get "foo:1.49" (out of range low) -> OK')
+    assert store.get("foo:3.1.1") is None
+    print('✅ Get "foo:3.1.1" (just past the upper bound) -> OK')
     assert store.get("nonexistent-app:1.0") is None
     print('✅ Get "nonexistent-app:1.0" -> OK')
 
+    print("\n--- Testing batch gets ---")
+    batch = ["foo:4.0", "pli-tv-bu-vb-np19:2.7", "foo:1.49", "foo:2.24", "bar:1.0",
+             "foo:3.1.1", "nonexistent-app:1.0", "foo:1.50", "pli-tv-bu-vb-pc4:2.1.18"]
+    assert store.get_many(batch) == [store.get(key_id) for key_id in batch]
+    assert store.get_many(batch * 3) == [store.get(key_id) for key_id in batch * 3]
+    print('✅ get_many matches get, in input order -> OK')
+
+    print("\n--- Testing span queries ---")
+    assert store.overlapping("foo:0.1", "foo:1.50") == [("foo:1.50", "foo:3.1", p3)]
+    assert store.overlapping("foo:3.1.1", "foo:9") == []
+    assert store.overlapping("bar:0", "bar:2") == [("bar:1.0", "bar:1.0", p4)]
+    print('✅ overlapping finds ranges and segment IDs in a span -> OK')
+    spans = IDRangePathStore()
+    spans.load_data_from_json(store.to_json(Path("/")), Path("/"))
+    assert spans.ranges_for_path(p2) == [("pli-tv-bu-vb-pc4:1.1.7", "pli-tv-bu-vb-pc4:2.1.18")]
+    spans.add("foo:4", "foo:5", p2)
+    assert spans.ranges_for_path(p2)[-1] == ("foo:4", "foo:5")
+    assert spans.overlapping("foo:3", "foo:4.1")[-1] == ("foo:4", "foo:5", p2)
+    print('✅ ranges_for_path lists what a path owns, kept up to date by add -> OK')
+
     print("\n--- Testing overlap detection ---")
     test_cases = [
         ("foo:2.0", "foo:2.50"),      # Case 1: New range is fully within an existing range
@@ -223,4 +1052,84 @@ if __name__ == "__main__":
             print(f"✅ PASS: Caught expected overlap for {lower}-{upper}.")
             # print(f"   (Error: {e})")
     
+    print("\n--- Testing bulk construction ---")
+    bulk = IDRangePathStore.from_ranges([
+        ("foo:1.50", "foo:3.1", p3),
+        ("pli-tv-bu-vb-pc4:1.1.7", "pli-tv-bu-vb-pc4:2.1.18", p2),
+        ("bar:1.0", "bar:1.0", p4),
+        ("pli-tv-bu-vb-np19:2.5", "pli-tv-bu-vb-np19:2.12", p1),
+    ])
+    assert json.loads(bulk.to_json(Path("/"))) == json.loads(store.to_json(Path("/")))
+    print('✅ from_ranges builds the same store as add -> OK')
+    for lower, upper in test_cases:
+        try:
+            IDRangePathStore.from_ranges([("foo:1.50", "foo:3.1", p3), (lower, upper, Path("/overlap"))])
+            print(f"❌ FAIL: Bulk overlap for {lower}-{upper} was not detected.")
+        except ValueError as e:
+            print(f"✅ PASS: Caught expected bulk overlap for {lower}-{upper}.")
+    
+    print("\n--- Testing lookup statistics ---")
+    store.stats = LookupStats()
+    store.get("foo:2.24"), store.get("bar:1.0"), store.get("foo:9"), store.get("foo")
+    store.get_many(["foo:2.24", "nonexistent-app"])
+    assert store.stats.as_dict() == {"plain_hits": 0, "plain_misses": 2, "range_hits": 3, "range_misses": 1}
+    store.stats = None
+    print('✅ Lookups are counted by kind when stats are enabled -> OK')
+    
+    print("\n--- Testing binary snapshots ---")
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_file = Path(tmp) / "store.bin"
+        snapshot_file.write_bytes(store.to_snapshot(Path("/files")))
+        loaded = IDRangePathStore.open_snapshot(snapshot_file, Path("/files"))
+        assert loaded.get("foo:2.24") == p3 and loaded.get("bar:1.0") == p4
+        assert loaded.get("foo:4.0") is None and loaded.get("nonexistent-app:1.0") is None
+        assert set(loaded._pending) == {"pli-tv-bu-vb-np19", "pli-tv-bu-vb-pc4"}
+        print('✅ Snapshot lookups decode only the appids they touch -> OK')
+        assert json.loads(loaded.to_json(Path("/"))) == json.loads(store.to_json(Path("/")))
+        print('✅ Snapshot round-trips the whole store -> OK')
+    
+    print("\n--- Testing the compact backend ---")
+    compact = CompactIDRangePathStore()
+    compact.load_data_from_json(store.to_json(Path("/")), Path("/"))
+    for key_id in ["pli-tv-bu-vb-np19:2.7", "foo:3.1.0", "foo:3.1.1", "foo:1.49", "bar:1.0", "foo:1.50.70000"]:
+        assert compact.get(key_id) == store.get(key_id)
+    print('✅ Compact lookups match the default backend -> OK')
+    compact.add("foo:70000.1.2.3", "foo:70000.1.2.4", p3)
+    assert compact.get("foo:70000.1.2.3.9") == p3 and compact.get("foo:2.24") == p3
+    print('✅ Compact ranges re-pack when wider segments are added -> OK')
+    
+    print("\n--- Testing concurrent access ---")
+    shared = ConcurrentIDRangePathStore(CompactIDRangePathStore)
+    shared.load_data_from_json(store.to_json(Path("/")), Path("/"))
+    before = shared.current()
+    failures = []
+    def read():
+        for _ in range(2000):
+            if shared.get("foo:2.24") != p3 or shared.get("bar:1.0") != p4:
+                failures.append("missing")
+            # bar:99 is only ever added in the same batch as bar:2.1
+            if shared.get("bar:99") is not None and shared.get("bar:2.1") is None:
+                failures.append("partial")
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(200):
+        shared.add_many([(f"bar:{i + 2}.1", f"bar:{i + 2}.9", Path(f"/bar/{i}")), ("bar:99", "", Path("/bar/99"))])
+    for reader in readers:
+        reader.join()
+    assert not failures and shared.get("bar:150.5") == Path("/bar/148")
+    print('✅ Readers see every batch whole while writers add more -> OK')
+    try:
+        shared.add_many([("bar:300.1", "bar:300.2", p4), ("foo:2.0", "foo:2.50", p4)])
+        print("❌ FAIL: Overlap in a batch was not detected.")
+    except ValueError:
+        assert shared.get("bar:300.1") is None
+        print("✅ PASS: A batch with an overlap publishes nothing.")
+    shared.stats = LookupStats()
+    assert before.get("bar:5.1") is None and before.fingerprint() != shared.fingerprint()
+    assert before.stats is None and shared.get("bar:5.1") is not None and shared.stats.range_hits == 1
+    shared.stats = None
+    print('✅ Published states never change -> OK')
+    
     print("\nAll tests completed.")
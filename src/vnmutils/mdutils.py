@@ -1,9 +1,23 @@
 #!/bin/python3
 
+import argparse
+import functools
+import hashlib
+import io
+import json
+import mmap
 import re
 import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, TextIO, Union
 
+from .fileutils import atomic_write_bytes
 from .idrangepathstore import IDRangePathStore
 
 SCUID_SEGMENT_PATHS = IDRangePathStore()
@@ -30,10 +44,25 @@ def full_obsidian_style_link_for_scuid(scuid: str, relative_to: Path) -> str:
 def abs_path_to_obsidian_link_text(path: Path, relative_to: Path) -> str:
   if relative_to.suffix: # if the filename contains a dot, assume it's a file
     relative_to = relative_to.parent
-  relpath = os.path.relpath(path, relative_to)
+  return _obsidian_link_text(path, relative_to)
+
+# The same (folder, target) pairs come up over and over in a vault
+OBSIDIAN_LINK_CACHE_SIZE = 1 << 16
+
+@functools.lru_cache(maxsize=OBSIDIAN_LINK_CACHE_SIZE)
+def _obsidian_link_text(path: Path, directory: Path) -> str:
+  relpath = os.path.relpath(path, directory)
   return "](" + \
     relpath.replace(' ', '%20').replace('(', '%28').replace(')', '%29') + \
     ")"
+
+def obsidian_link_cache_info():
+  """Hit and miss statistics for the relative link cache
+  (a functools.lru_cache CacheInfo)"""
+  return _obsidian_link_text.cache_info()
+
+def clear_obsidian_link_cache():
+  _obsidian_link_text.cache_clear()
   
 # This is the style for the links that Ajahn Brahmali includes in his notes
 # See suttacentral.sc_link_for_ref for the format of our links
@@ -41,10 +70,69 @@ SUTTACENTRAL_LINK_RE = re.compile(
   r'\[([^\]]+)\]\(https://suttacentral\.net/([\w-]+)/en/brahmali/?#?([0-9.]*)\)'
 )
 
-def rewrite_suttacentral_links_in_markdown_file(markdownfile: Path):
-  text = markdownfile.read_text(encoding='utf-8')
+class LinkRewriteSummary(NamedTuple):
+  """What rewriting the suttacentral links in one markdown file did"""
+  path: Path
+  rewritten: int
+  # SCUIDs which were not in SCUID_SEGMENT_PATHS and so were left as is
+  unresolved: tuple[str, ...]
+  bytes_read: int = 0
+  bytes_written: int = 0
+  # Wall clock time spent on the file
+  seconds: float = 0.0
+
+  @property
+  def matched(self) -> int:
+    """How many suttacentral links were found"""
+    return self.rewritten + len(self.unresolved)
+
+# Every link SUTTACENTRAL_LINK_RE can match contains this
+SUTTACENTRAL_LINK_MARKER = b'suttacentral.net/'
+# Files at least this big are searched for the marker through an mmap
+MMAP_THRESHOLD = 1 << 20
 
-  def replacer(match):
+def _read_if_has_suttacentral_links(markdownfile: Path) -> tuple[int, Optional[bytes]]:
+  """Returns the file's size and contents, or None without reading it all
+  if it doesn't contain SUTTACENTRAL_LINK_MARKER"""
+  with markdownfile.open('rb') as f:
+    size = os.fstat(f.fileno()).st_size
+    if size < MMAP_THRESHOLD:
+      data = f.read()
+      return len(data), (data if SUTTACENTRAL_LINK_MARKER in data else None)
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+      if mapped.find(SUTTACENTRAL_LINK_MARKER) == -1:
+        return size, None
+      return size, mapped[:]
+
+def rewrite_suttacentral_links_in_markdown_file(markdownfile: Path) -> LinkRewriteSummary:
+  start = time.perf_counter()
+  bytes_read, data = _read_if_has_suttacentral_links(markdownfile)
+  if data is None:
+    return LinkRewriteSummary(markdownfile, 0, (), bytes_read, 0, time.perf_counter() - start)
+  text = data.decode('utf-8')
+  replacer = _LinkReplacer(markdownfile.parent)
+  new_text = SUTTACENTRAL_LINK_RE.sub(replacer, text)
+  bytes_written = 0
+  if new_text != text:
+    new_data = new_text.encode('utf-8')
+    atomic_write_bytes(markdownfile, new_data)
+    bytes_written = len(new_data)
+  return LinkRewriteSummary(
+    markdownfile, replacer.rewritten, tuple(replacer.unresolved),
+    bytes_read, bytes_written, time.perf_counter() - start,
+  )
+
+class _LinkReplacer:
+  """SUTTACENTRAL_LINK_RE.sub callback which keeps count of what it did"""
+  def __init__(self, folder: Path):
+    # The folder the links are relative to. Not passed through
+    # abs_path_to_obsidian_link_text, which would take a folder
+    # with a dot in its name for a file
+    self.folder = folder
+    self.rewritten = 0
+    self.unresolved = []
+
+  def __call__(self, match) -> str:
     link_text = match.group(1)
     document = match.group(2)
     segment = match.group(3)
@@ -58,16 +146,397 @@ def rewrite_suttacentral_links_in_markdown_file(markdownfile: Path):
     absolute_path = SCUID_SEGMENT_PATHS.get(scid)
 
     if absolute_path:
-      obsidian_link = abs_path_to_obsidian_link_text(absolute_path, markdownfile.parent)
+      self.rewritten += 1
+      obsidian_link = _obsidian_link_text(absolute_path, self.folder)
       return f"[{link_text}{obsidian_link}"
     else:
+      self.unresolved.append(scid)
       return match.group(0)  # Leave unchanged if not found
 
-  new_text = SUTTACENTRAL_LINK_RE.sub(replacer, text)
-  if new_text != text:
-    markdownfile.write_text(new_text, encoding='utf-8')
+def _literal_prefix_pattern(literal: str, then: str = '') -> str:
+  """A pattern for any prefix of literal, or all of it followed by then"""
+  pattern = f'(?:{then})?' if then else ''
+  for char in reversed(literal):
+    pattern = f'(?:{re.escape(char)}{pattern})?'
+  return pattern
+
+# Matches, at the end of some text, the start of what could become a
+# SUTTACENTRAL_LINK_RE match once more text arrives
+_PARTIAL_SUTTACENTRAL_LINK_RE = re.compile(
+  r'\[[^\]]*' + _literal_prefix_pattern(
+    '](https://suttacentral.net/',
+    r'[\w-]+' + _literal_prefix_pattern('/en/brahmali', r'/?#?[0-9.]*'),
+  ) + r'\Z'
+)
+# How much text to read at a time from file-like objects
+STREAM_CHUNK_SIZE = 1 << 16
+# Text held back waiting for the rest of a link is never more than this,
+# so longer links are passed through as they are
+STREAM_MAX_PENDING = 1 << 16
+
+def _stream_split_point(buffer: str, max_pending: int) -> int:
+  """Where buffer can be cut without cutting through a link"""
+  start = 0
+  while True:
+    partial = _PARTIAL_SUTTACENTRAL_LINK_RE.search(buffer, start)
+    if partial is None:
+      return len(buffer)
+    if len(buffer) - partial.start() <= max_pending:
+      return partial.start()
+    start = partial.start() + 1
+
+def rewrite_suttacentral_links_in_stream(
+  chunks: Union[Iterable[str], TextIO],
+  relative_to: Path,
+  max_pending: int = STREAM_MAX_PENDING,
+  on_unresolved: Optional[Callable[[str], None]] = None,
+) -> Iterator[str]:
+  """Rewrites the links in markdown arriving in pieces, yielding the result
+  in pieces, so that text of any size can be rewritten in bounded memory.
+
+  Args:
+    chunks: Any iterable of str (e.g. lines) or a text file-like object
+    relative_to: The folder the markdown will be saved in, which the new
+      links are relative to
+    max_pending: The most text to hold back when a chunk ends part way
+      through what may be a link. Links longer than this are left as is.
+    on_unresolved: Called with each SCUID which isn't in SCUID_SEGMENT_PATHS
+  Yields:
+    The rewritten text, with links which span chunks rewritten whole"""
+  if hasattr(chunks, 'read'):
+    chunks = iter(functools.partial(chunks.read, STREAM_CHUNK_SIZE), '')
+  replacer = _LinkReplacer(relative_to)
+  def rewrite(text: str) -> str:
+    text = SUTTACENTRAL_LINK_RE.sub(replacer, text)
+    if on_unresolved is not None:
+      for scuid in replacer.unresolved:
+        on_unresolved(scuid)
+    replacer.unresolved.clear()
+    return text
+
+  pending = ''
+  for chunk in chunks:
+    if not pending and '[' not in chunk:
+      yield chunk
+      continue
+    buffer = pending + chunk
+    split = _stream_split_point(buffer, max_pending)
+    pending = buffer[split:]
+    if split:
+      yield rewrite(buffer[:split])
+  if pending:
+    yield rewrite(pending)
+
+def _install_scuid_segment_paths(store: IDRangePathStore):
+  """Process pool initializer so each worker receives the store only once"""
+  global SCUID_SEGMENT_PATHS
+  SCUID_SEGMENT_PATHS = store
+
+def _rewrite_markdown_files(
+  markdownfiles: list[Path],
+  workers: Optional[int],
+  on_file: Optional[Callable[[LinkRewriteSummary], None]] = None,
+) -> list[LinkRewriteSummary]:
+  workers = workers or os.cpu_count() or 1
+  if workers == 1 or len(markdownfiles) < 2:
+    summaries = map(rewrite_suttacentral_links_in_markdown_file, markdownfiles)
+    return [_report(summary, on_file) for summary in summaries]
+  chunksize = max(1, len(markdownfiles) // (4 * workers))
+  with ProcessPoolExecutor(
+    max_workers=workers,
+    initializer=_install_scuid_segment_paths,
+    initargs=(SCUID_SEGMENT_PATHS,),
+  ) as executor:
+    summaries = executor.map(
+      rewrite_suttacentral_links_in_markdown_file,
+      markdownfiles,
+      chunksize=chunksize,
+    )
+    return [_report(summary, on_file) for summary in summaries]
+
+def _report(summary: LinkRewriteSummary, on_file: Optional[Callable[[LinkRewriteSummary], None]]):
+  if on_file is not None:
+    on_file(summary)
+  return summary
+
+# Bump whenever the rewriting itself changes so old manifests are discarded
+LINK_MANIFEST_VERSION = 1
+
+_LINK_MANIFEST_RECORD_KEYS = frozenset(('mtime_ns', 'size', 'sha256', 'unresolved'))
+
+def _file_digest(path: Path) -> str:
+  return hashlib.sha256(path.read_bytes()).hexdigest()
+
+def _load_link_manifest(manifest: Path) -> dict:
+  try:
+    data = json.loads(manifest.read_text(encoding='utf-8'))
+  except (OSError, ValueError):
+    return {}
+  if not isinstance(data, dict) or data.get('version') != LINK_MANIFEST_VERSION:
+    return {}
+  files = data.get('files')
+  if not isinstance(files, dict):
+    return {}
+  # Drop unusable records so that those files are simply rewritten
+  data['files'] = {
+    key: record for key, record in files.items()
+    if isinstance(record, dict) and _LINK_MANIFEST_RECORD_KEYS <= record.keys()
+  }
+  return data
+
+def rewrite_suttacentral_links_in_folder(
+  folder: Path,
+  workers: Optional[int] = 1,
+  manifest: Optional[Path] = None,
+  on_file: Optional[Callable[[LinkRewriteSummary], None]] = None,
+) -> list[LinkRewriteSummary]:
+  """Rewrites the links in every markdown file under folder.
+
+  With workers > 1 (or None for one per CPU) the files are spread across
+  a pool of processes, each of which is sent SCUID_SEGMENT_PATHS once.
+
+  Given a manifest file, only rewrites files which changed since the last
+  run with that manifest, or which contain a SCUID that was unresolved then
+  but resolves now. When neither the files nor SCUID_SEGMENT_PATHS have
+  changed, that costs one stat per file.
+
+  on_file, if given, is called with each file's summary as soon as it's
+  done, e.g. to report progress or log unresolved SCUIDs. To count the
+  lookups into the store too, set SCUID_SEGMENT_PATHS.stats to a
+  LookupStats and use a single worker, as lookups in other processes
+  aren't counted.
+
+  Returns, in the order the files were found, a summary for every file or,
+  given a manifest, for every file which wasn't skipped."""
+  markdownfiles = list(folder.glob('**/*.md'))
+  if manifest is None:
+    return _rewrite_markdown_files(markdownfiles, workers, on_file)
+
+  previous = _load_link_manifest(manifest)
+  previous_files = previous.get('files', {})
+  fingerprint = SCUID_SEGMENT_PATHS.fingerprint()
+  store_changed = previous.get('store') != fingerprint
+  files = {}
+  todo = []
+  for markdownfile in markdownfiles:
+    key = markdownfile.relative_to(folder).as_posix()
+    record = previous_files.get(key)
+    if record is not None:
+      stat = markdownfile.stat()
+      if (stat.st_mtime_ns, stat.st_size) != (record['mtime_ns'], record['size']):
+        # Touched, but maybe not changed
+        if _file_digest(markdownfile) != record['sha256']:
+          record = None
+        else:
+          record = dict(record, mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+    if record is not None and store_changed and any(
+      SCUID_SEGMENT_PATHS.get(scuid) for scuid in record['unresolved']
+    ):
+      record = None
+    if record is None:
+      todo.append(markdownfile)
+    else:
+      files[key] = record
+
+  summaries = _rewrite_markdown_files(todo, workers, on_file)
+  for summary in summaries:
+    stat = summary.path.stat()
+    files[summary.path.relative_to(folder).as_posix()] = {
+      'mtime_ns': stat.st_mtime_ns,
+      'size': stat.st_size,
+      'sha256': _file_digest(summary.path),
+      'unresolved': sorted(set(summary.unresolved)),
+    }
+  atomic_write_bytes(manifest, json.dumps({
+    'version': LINK_MANIFEST_VERSION,
+    'store': fingerprint,
+    'files': files,
+  }).encode('utf-8'))
+  return summaries
+
+def _fingerprint_sources(sources: Iterable[Path], exclude: Optional[Path] = None) -> bytes:
+  """A digest of the path, size and mtime of every file in sources
+  other than exclude"""
+  exclude = exclude and exclude.resolve()
+  stats = []
+  for source in sources:
+    for path in ([source] if source.is_file() else source.glob('**/*')):
+      if path.is_file() and path.resolve() != exclude:
+        stat = path.stat()
+        stats.append((str(path), stat.st_size, stat.st_mtime_ns))
+  return hashlib.sha256(json.dumps(sorted(stats)).encode('utf-8')).digest()
+
+def load_scuid_segment_paths(
+  cache_file: Path,
+  sources: Iterable[Path],
+  build: Callable[[], IDRangePathStore],
+  paths_relative_to: Path,
+  store_class: type = IDRangePathStore,
+) -> IDRangePathStore:
+  """Installs a populated store as SCUID_SEGMENT_PATHS, reusing cache_file
+  for as long as nothing in sources (files or folders) has changed.
+
+  Args:
+    cache_file: Where to keep the store. It holds a fingerprint of sources
+      followed by an IDRangePathStore snapshot, which is memory-mapped and
+      decoded lazily when the fingerprint still matches.
+    sources: The files and folders the store is built from
+    build: Called to build the store from scratch when the cache is stale
+    paths_relative_to: Base folder for the paths saved in the cache
+    store_class: What to load the cache into
+  Returns:
+    The new SCUID_SEGMENT_PATHS. Note that the global is rebound, so code
+    holding the old store (e.g. via `from .mdutils import SCUID_SEGMENT_PATHS`)
+    won't see the new one."""
+  global SCUID_SEGMENT_PATHS
+  # The cache may be kept among its own sources, but mustn't invalidate itself
+  fingerprint = _fingerprint_sources(sources, exclude=cache_file)
+  store = None
+  try:
+    with cache_file.open('rb') as f:
+      if f.read(len(fingerprint)) == fingerprint:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        store = store_class()
+        store.load_data_from_snapshot(memoryview(buffer)[len(fingerprint):], paths_relative_to)
+  except (OSError, ValueError, struct.error):
+    store = None # Missing or corrupt, so rebuild it
+  if store is None:
+    store = build()
+    atomic_write_bytes(cache_file, fingerprint + store.to_snapshot(paths_relative_to))
+  # A single rebinding, so other threads see either the old or new store
+  SCUID_SEGMENT_PATHS = store
+  return store
+
+def main(argv: Optional[list[str]] = None) -> int:
+  """Command line pipe filter around rewrite_suttacentral_links_in_stream"""
+  parser = argparse.ArgumentParser(
+    description="Rewrite suttacentral links in markdown read from files or stdin to stdout.",
+  )
+  parser.add_argument('files', nargs='*', type=Path, help="markdown to rewrite (default: stdin)")
+  store = parser.add_mutually_exclusive_group(required=True)
+  store.add_argument('--json', type=Path, help="an IDRangePathStore saved with to_json")
+  store.add_argument('--snapshot', type=Path, help="an IDRangePathStore saved with to_snapshot")
+  parser.add_argument('--paths-relative-to', type=Path,
+                      help="what the store's paths are relative to (default: the store's folder)")
+  parser.add_argument('--relative-to', type=Path, default=Path.cwd(),
+                      help="the folder the output will be saved in, for relative links "
+                           "(default: the current folder)")
+  parser.add_argument('--warn-unresolved', action='store_true',
+                      help="print each SCUID that isn't in the store to stderr")
+  args = parser.parse_args(argv)
+
+  store_file = args.json or args.snapshot
+  paths_relative_to = args.paths_relative_to or store_file.resolve().parent
+  if args.json:
+    store = IDRangePathStore()
+    store.load_data_from_json(args.json.read_text(encoding='utf-8'), paths_relative_to)
+  else:
+    store = IDRangePathStore.open_snapshot(args.snapshot, paths_relative_to)
+  _install_scuid_segment_paths(store)
+
+  def warn(scuid: str):
+    print(f"Unresolved SCUID: {scuid}", file=sys.stderr)
+  # newline='' so that line endings pass through untouched
+  out = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='')
+  def rewrite(f):
+    for chunk in rewrite_suttacentral_links_in_stream(
+      f, args.relative_to, on_unresolved=warn if args.warn_unresolved else None,
+    ):
+      out.write(chunk)
+
+  try:
+    for source in args.files:
+      with source.open(encoding='utf-8', newline='') as f:
+        rewrite(f)
+    if not args.files:
+      stdin = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', newline='')
+      try:
+        rewrite(stdin)
+      finally:
+        stdin.detach() # Leave sys.stdin open
+    out.flush()
+  except BrokenPipeError:
+    # The reader went away (e.g. `| head`), so stop quietly
+    os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    return 1
+  finally:
+    out.detach() # Leave sys.stdout open
+  return 0
+
+if __name__ == '__main__' and len(sys.argv) > 1:
+  sys.exit(main())
+
+# Self-checks, run when given no arguments
+if __name__ == '__main__':
+  import random
+  rng = random.Random(0)
+  vault = Path(tempfile.mkdtemp())
+  ranges = [
+    ("pli-tv-bu-vb-pj1:1.1", "pli-tv-bu-vb-pj1:9.9", vault / "Pj1.md"),
+    ("pli-tv-bu-vb-pc4:1.1", "pli-tv-bu-vb-pc4:2.9", vault / "Rules" / "Pc4 (Lying).md"),
+    ("pli-tv-kd1", "", vault / "Kd1.md"),
+  ]
+  SCUID_SEGMENT_PATHS = IDRangePathStore.from_ranges(ranges)
+
+  print("\n--- Testing streaming rewrites ---")
+  pieces = [
+    "[Pj 1](https://suttacentral.net/pli-tv-bu-vb-pj1/en/brahmali#1.2)",
+    "[Pc 4](https://suttacentral.net/pli-tv-bu-vb-pc4/en/brahmali/#2.3.)",
+    "[Kd 1](https://suttacentral.net/pli-tv-kd1/en/brahmali)",
+    "[Unknown](https://suttacentral.net/pli-tv-kd99/en/brahmali#1.1)",
+    "[almost](https://suttacentral.net/pli-tv-bu-vb-pj1/en/sujato#1.2)",
+    "[[nested] [brackets](", "](https://suttacentral.net/", "]", "[", "\n", " ", "a few words",
+  ]
+  for _ in range(200):
+    text = ''.join(rng.choice(pieces) for _ in range(rng.randrange(1, 30)))
+    expected = SUTTACENTRAL_LINK_RE.sub(_LinkReplacer(vault / "Notes"), text)
+    cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, rng.randrange(0, 20))))
+    chunks = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+    unresolved = []
+    streamed = ''.join(rewrite_suttacentral_links_in_stream(chunks, vault / "Notes", on_unresolved=unresolved.append))
+    assert streamed == expected, (chunks, streamed, expected)
+    assert len(unresolved) == text.count("pli-tv-kd99/en/brahmali#")
+    assert ''.join(rewrite_suttacentral_links_in_stream(io.StringIO(text), vault / "Notes")) == expected
+  print('✅ Streaming matches rewriting the whole text at once, however it is chunked -> OK')
+  streamed = ''.join(rewrite_suttacentral_links_in_stream([pieces[0]], vault / "notes.v2"))
+  assert streamed == "[Pj 1](../Pj1.md)", streamed
+  print('✅ Links are relative to the folder given, even with a dot in its name -> OK')
+
+  print("\n--- Testing incremental folder rewrites ---")
+  notes = vault / "Notes"
+  notes.mkdir()
+  originals = {
+    "resolved.md": "See [Pj 1](https://suttacentral.net/pli-tv-bu-vb-pj1/en/brahmali#1.2).\n",
+    "later.md": "See [Pc 5](https://suttacentral.net/pli-tv-bu-vb-pc5/en/brahmali#1.1).\n",
+    "never.md": "See [Kd 99](https://suttacentral.net/pli-tv-kd99/en/brahmali#1.1).\n",
+    "plain.md": "No links here.\n",
+  }
+  for name, text in originals.items():
+    (notes / name).write_text(text, encoding='utf-8')
+  manifest = vault / "manifest.json"
+  first = rewrite_suttacentral_links_in_folder(notes, manifest=manifest)
+  assert sorted(summary.path.name for summary in first) == sorted(originals)
+  assert "Pj1.md" in (notes / "resolved.md").read_text(encoding='utf-8')
+  assert rewrite_suttacentral_links_in_folder(notes, manifest=manifest) == []
+  print('✅ A second run rewrites nothing -> OK')
+  SCUID_SEGMENT_PATHS = IDRangePathStore.from_ranges(
+    ranges + [("pli-tv-bu-vb-pc5:1.1", "pli-tv-bu-vb-pc5:1.9", vault / "Pc5.md")]
+  )
+  third = rewrite_suttacentral_links_in_folder(notes, manifest=manifest)
+  assert [summary.path.name for summary in third] == ["later.md"] and third[0].rewritten == 1
+  assert "Pc5.md" in (notes / "later.md").read_text(encoding='utf-8')
+  print('✅ A store change re-rewrites only files whose unresolved SCUIDs now resolve -> OK')
+  (notes / "plain.md").write_text(originals["plain.md"] + "More.\n", encoding='utf-8')
+  assert [summary.path.name for summary in rewrite_suttacentral_links_in_folder(notes, manifest=manifest)] == ["plain.md"]
+  print('✅ Edited files are rewritten -> OK')
+  print("\n--- Testing atomic writes ---")
+  (vault / "real").mkdir()
+  (vault / "real" / "linked.md").write_text(originals["resolved.md"], encoding='utf-8')
+  (notes / "linked.md").symlink_to(vault / "real" / "linked.md")
+  rewrite_suttacentral_links_in_markdown_file(notes / "linked.md")
+  assert (notes / "linked.md").is_symlink()
+  assert "Pj1.md" in (vault / "real" / "linked.md").read_text(encoding='utf-8')
+  print('✅ Symlinked notes are rewritten through the link -> OK')
+  shutil.rmtree(vault)
 
-def rewrite_suttacentral_links_in_folder(folder: Path):
-  for markdownfile in folder.glob('**/*.md'):
-    rewrite_suttacentral_links_in_markdown_file(markdownfile)
- 
+  print("\nAll tests completed.")
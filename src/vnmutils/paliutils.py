@@ -1,6 +1,17 @@
 #!/bin/python3
 
+import bisect
+import functools
+import hashlib
+import json
+import os
 import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Hashable, Iterable, Iterator, Optional, Union
+
+from .fileutils import atomic_write_bytes
 
 def normalize(text: str) -> str:
   """Nondestructively replaces equivelant characters with the standard form"""
@@ -11,6 +22,9 @@ PALI_ALPHABET = normalize(
 ).split(' ')
 PALI_CAPS = [l.upper() for l in PALI_ALPHABET]
 PALI_ALPHABET_WITH_CAPS = PALI_ALPHABET + PALI_CAPS
+# sanitize works character by character, so only the single-character letters matter
+_PALI_CHARS = frozenset(l for l in PALI_ALPHABET if len(l) == 1)
+_PALI_CHARS_WITH_CAPS = frozenset(l for l in PALI_ALPHABET_WITH_CAPS if len(l) == 1)
 PALI_SUFFIXES = [['amhase', 'esānaṁ'],
   ['attha', 'aṇīya', 'anīya', 'assaṁ', 'issaṁ', 'ittha', 'ittho', 'ismiṁ', 'usmiṁ', 'ānāti'],
   ['antī', 'asso', 'amha', 'anta', 'onta', 'unta', 'enta', 'assa', 'assā', 'issa', 'ismā', 'amhā', 'amhi', 'ānaṁ', 'asmā', 'asmiṁ', 'āyaṁ', 'āvin', 'āsaṁ', 'iṁsu', 'imha', 'imhā', 'imhi', 'iyaṁ', 'isaṁ', 'isuṁ', 'īnaṁ', 'umhā', 'umhi', 'uyaṁ', 'usaṁ', 'usmā', 'ussa', 'ūnaṁ', 'ūbhi', 'etha', 'etho', 'eraṁ', 'esaṁ'],
@@ -59,14 +73,42 @@ MANUAL_NORMALIZATIONS = {
   ('Anāpucchā', 'ārāmaṁ', 'paviseyyāti'): ['ārāmaṁ', 'anāpucchā', 'paviseyya'], # word order is different in the rule
 }
 
-def stem(word: str) -> str:
-  word = word.lower()
+# PALI_SUFFIXES as a trie of reversed suffixes so that the
+# longest one a word ends with can be found in a single walk
+_SUFFIX_END = None
+def _build_suffix_trie() -> dict:
+  trie = {}
   for i, group in enumerate(PALI_SUFFIXES):
     n = len(PALI_SUFFIXES) - i
-    suffix = word[-n:]
-    if suffix in group:
-      return word[:-n]
-  return word
+    for suffix in group:
+      if len(suffix) != n: # would never be matched by its group (e.g. 'asmiṁ')
+        continue
+      node = trie
+      for c in reversed(suffix):
+        node = node.setdefault(c, {})
+      node[_SUFFIX_END] = True
+  return trie
+_SUFFIX_TRIE = _build_suffix_trie()
+
+# The same few thousand forms recur throughout the Vinaya
+STEM_CACHE_SIZE = 1 << 14
+
+@functools.lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word: str) -> str:
+  """Strips the longest of the PALI_SUFFIXES the word ends with"""
+  word = word.lower()
+  node = _SUFFIX_TRIE
+  longest = 0
+  for depth, c in enumerate(reversed(word), 1):
+    node = node.get(c)
+    if node is None:
+      break
+    if _SUFFIX_END in node:
+      longest = depth
+  return word[:-longest] if longest else word
+
+def stem_many(words: list[str]) -> list[str]:
+  return [stem(word) for word in words]
 
 def unquote(quote: str) -> str:
   if quote.endswith('ti'):
@@ -87,25 +129,193 @@ def unquote(quote: str) -> str:
 def sanitize(text: str, lower: bool=True) -> str:
   """Strips a string of all non-Pali characters
   returns what's left in lowercase if lower."""
-  valids = PALI_ALPHABET_WITH_CAPS
+  valids = _PALI_CHARS_WITH_CAPS
   if lower:
     text = text.lower()
-    valids = PALI_ALPHABET
+    valids = _PALI_CHARS
   return ''.join(filter(
     valids.__contains__,
     normalize(text)
   ))
 
+class _SanitizeTable(dict):
+  """A str.translate table which keeps the given characters (and the
+  separator used by sanitize_many) and deletes everything else.
+  Fills itself in as new characters are seen."""
+  def __init__(self, valids: frozenset):
+    super().__init__()
+    self.valids = valids | {_SANITIZE_SEPARATOR}
+  def __missing__(self, codepoint: int):
+    ret = self[codepoint] = codepoint if chr(codepoint) in self.valids else None
+    return ret
+
+# Nothing composes with a newline, so joining on one keeps words independent
+_SANITIZE_SEPARATOR = '\n'
+_SANITIZE_TABLE = _SanitizeTable(_PALI_CHARS)
+_SANITIZE_TABLE_WITH_CAPS = _SanitizeTable(_PALI_CHARS_WITH_CAPS)
+
+def sanitize_many(words: list[str], lower: bool=True) -> list[str]:
+  """Equivalent to [sanitize(w, lower) for w in words]
+  but normalizes the whole line in one pass."""
+  if not words:
+    return []
+  text = _SANITIZE_SEPARATOR.join(words)
+  if text.count(_SANITIZE_SEPARATOR) != len(words) - 1:
+    return [sanitize(word, lower) for word in words]
+  table = _SANITIZE_TABLE_WITH_CAPS
+  if lower:
+    text = text.lower()
+    table = _SANITIZE_TABLE
+  return normalize(text).translate(table).split(_SANITIZE_SEPARATOR)
+
 def pali_stem(word: str) -> str:
   return stem(sanitize(word))
 
-def match_terms_to_root_text(terms: list[list[str]], root_text: list[list[str]]) -> list[tuple[int, int, int]]:
+def _normalize_term(term: tuple[str, ...]) -> tuple[str, ...]:
+  if term in MANUAL_NORMALIZATIONS:
+    return tuple(stem_many(MANUAL_NORMALIZATIONS[term]))
+  # Otherwise, do it automatically
+  normalized = sanitize_many(list(term))
+  # REMOVE THE QUOTE MARKS
+  if "nāma" in normalized:
+    # Usually at the end, but some, like pli-tv-bu-vb-ss7:2.1,
+    # contain the " nāma" in the middle! >.<
+    normalized = normalized[:normalized.index("nāma")]
+  elif term and term[-1] == "hotīti": # final hoti's aren't necessary
+    del normalized[-1]
+    if len(normalized) == 0: # unless they are
+      normalized = ['hoti']
+  else:
+    normalized[-1] = unquote(normalized[-1])
+  # SPLIT COMPOUNDS
+  j = 0
+  while j < len(normalized):
+    if normalized[j] in COMPOUNDS:
+      compound = normalized[j]
+      normalized = normalized[:j] + COMPOUNDS[compound] + normalized[j+1:]
+      j += len(COMPOUNDS[compound])
+    else:
+      j += 1
+  return tuple(stem_many(normalized))
+
+# Raw term -> normalized term, shared by every call
+_TERM_NORMALIZATIONS: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+def normalize_term(term: list[str]) -> tuple[str, ...]:
+  """The stems which match_terms_to_root_text looks for to find one of
+  the Vibhanga's terms in the root text. For example:
+    ['bhikkhu', 'nāma'] -> ('bhikkh',)
+  Memoized, see also save_term_normalizations"""
+  term = tuple(term)
+  ret = _TERM_NORMALIZATIONS.get(term)
+  if ret is None:
+    ret = _TERM_NORMALIZATIONS[term] = _normalize_term(term)
+  return ret
+
+# Bump whenever the code behind normalize_term (e.g. _normalize_term,
+# unquote or stem) changes so old saved normalizations are discarded
+TERM_NORMALIZATION_VERSION = 1
+
+def _normalization_tables_fingerprint() -> str:
+  """Changes whenever a change to this module's tables (or
+  TERM_NORMALIZATION_VERSION) could change what normalize_term returns"""
+  return hashlib.sha256(repr((
+    TERM_NORMALIZATION_VERSION,
+    PALI_ALPHABET,
+    sorted(sorted(group) for group in PALI_SUFFIXES),
+    sorted(COMPOUNDS.items()),
+    sorted(MANUAL_NORMALIZATIONS.items()),
+  )).encode('utf-8')).hexdigest()
+
+def save_term_normalizations(path: Path):
+  """Saves normalize_term's memo so a later build can load_term_normalizations"""
+  data = json.dumps({
+    'tables': _normalization_tables_fingerprint(),
+    'terms': [[list(term), list(normalized)] for term, normalized in _TERM_NORMALIZATIONS.items()],
+  }, ensure_ascii=False).encode('utf-8')
+  # Written atomically as pool workers may be reading it
+  atomic_write_bytes(path, data)
+
+def load_term_normalizations(path: Path) -> bool:
+  """Adds the normalizations saved by save_term_normalizations to the memo.
+  Returns False (loading nothing) if the file is missing, malformed or
+  was saved with different normalization tables."""
+  try:
+    data = json.loads(path.read_text(encoding='utf-8'))
+    if data.get('tables') != _normalization_tables_fingerprint():
+      return False
+    normalizations = {tuple(term): tuple(normalized) for term, normalized in data['terms']}
+  except (OSError, ValueError, AttributeError, KeyError, TypeError):
+    return False
+  _TERM_NORMALIZATIONS.update(normalizations)
+  return True
+
+class RootTextIndex:
+  """A root text normalized once, for matching many term lists against it.
+
+  Also indexes where each stem occurs so that the matcher can jump
+  straight to the places a term could start."""
+  def __init__(self, root_text: list[list[str]]):
+    self.lines = [stem_many(sanitize_many(line)) for line in root_text]
+    self._positions = {}
+    for line_number, line in enumerate(self.lines):
+      for index_within_line, word in enumerate(line):
+        self._positions.setdefault(word, []).append((line_number, index_within_line))
+    self._candidates = {}
+
+  def candidates(self, word: str) -> list[tuple[int, int]]:
+    """Every (line_number, index_within_line) whose stem contains word, in order"""
+    ret = self._candidates.get(word)
+    if ret is None:
+      # Terms match partially, so look through every distinct stem
+      ret = sorted(
+        position
+        for stemmed, positions in self._positions.items() if word in stemmed
+        for position in positions
+      )
+      self._candidates[word] = ret
+    return ret
+
+  def is_match(self, line_number: int, start_index: int, term: list[str]) -> bool:
+    line = self.lines[line_number]
+    for i in range(start_index, start_index+len(term)):
+      # Have to support partial matches.
+      # This may break if a term is trimmed down too much by the stemmer
+      # Will figure that out when it comes up...
+      if term[i-start_index] not in line[i]:
+        return False
+    return True
+
+  def find(self, term: list[str], line_number: int, index_within_line: int) -> Optional[tuple[int, int]]:
+    """The first place at or after (line_number, index_within_line) where
+    the whole of term fits within a line and matches, or None"""
+    if not term:
+      while line_number < len(self.lines):
+        if index_within_line <= len(self.lines[line_number]):
+          return (line_number, index_within_line)
+        line_number += 1
+        index_within_line = 0
+      return None
+    candidates = self.candidates(term[0])
+    for i in range(bisect.bisect_left(candidates, (line_number, index_within_line)), len(candidates)):
+      line_number, index_within_line = candidates[i]
+      if index_within_line > len(self.lines[line_number]) - len(term):
+        continue
+      if self.is_match(line_number, index_within_line, term):
+        return (line_number, index_within_line)
+    return None
+
+def match_terms_to_root_text(
+  terms: list[list[str]],
+  root_text: Union[list[list[str]], RootTextIndex],
+) -> list[tuple[int, int, int]]:
   """
   Args:
     terms: A list of the Vibangha's terms.
       For example: [['Yo', 'panāti'], ['bhikkhu', 'nāma']]
     root_text: A list of lines of the root text. Each list is split by word.
       For example: [['Yo', 'pana', 'bhikkhu'], [etc]]
+      Or a RootTextIndex of one, to reuse across calls.
   Returns:
     A list of tuples in the form: (line_number, start_index, end_index)
     One tuple for each term showing where in the root text that term can be found.
@@ -114,90 +324,47 @@ def match_terms_to_root_text(terms: list[list[str]], root_text: list[list[str]])
     - a term cannot be found within a single line
     - terms are not found in the order they were passed in 
   """
-  normalized_terms = []
   if len(terms) == 0:
-    return normalized_terms
-  for i, term in enumerate(terms):
-    if tuple(term) in MANUAL_NORMALIZATIONS:
-      normalized_terms.append(MANUAL_NORMALIZATIONS[tuple(term)])
-      continue
-    # Otherwise, do it automatically
-    normalized_terms.append([sanitize(t) for t in term])
-    # REMOVE THE QUOTE MARKS
-    if "nāma" in normalized_terms[-1]:
-      # Usually at the end, but some, like pli-tv-bu-vb-ss7:2.1,
-      # contain the " nāma" in the middle! >.<
-      nama = normalized_terms[i].index("nāma")
-      normalized_terms[i] = normalized_terms[i][:nama]
-    elif term[-1] == "hotīti": # final hoti's aren't necessary
-      del normalized_terms[i][-1]
-      if len(normalized_terms[i]) == 0: # unless they are
-        normalized_terms[i] = ['hoti']
-    else:
-      normalized_terms[i][-1] = unquote(normalized_terms[i][-1])
-    # SPLIT COMPOUNDS
-    j = 0
-    while j < len(normalized_terms[i]):
-      if normalized_terms[i][j] in COMPOUNDS:
-        compound = normalized_terms[i][j]
-        normalized_terms[i] = normalized_terms[i][:j] + \
-          COMPOUNDS[compound] + \
-          normalized_terms[i][j+1:]
-        j += len(COMPOUNDS[compound])
-      else:
-        j += 1
-
-  for i, term in enumerate(normalized_terms):
-    normalized_terms[i] = [stem(t) for t in term]
+    return []
+  # Lists, as the 'a' prefix retry below edits them
+  normalized_terms = [list(normalize_term(term)) for term in terms]
   
-  normalized_root_text = []
-  for line in root_text:
-    normalized_root_text.append([stem(sanitize(t)) for t in line])
+  if not isinstance(root_text, RootTextIndex):
+    root_text = RootTextIndex(root_text)
+  normalized_root_text = root_text.lines
   
   output = []
   # Greedy Algorithm: just take the first match we find
-  def _is_match(line_number, start_index, term):
-    for i in range(start_index, start_index+len(term)):
-      # Have to support partial matches.
-      # This may break if a term is trimmed down too much by the stemmer
-      # Will figure that out when it comes up...
-      if term[i-start_index] not in normalized_root_text[line_number][i]:
-        return False
-    return True
   def _process_remaining_terms(line_number: int, index_within_line: int, term_index: int) -> bool:
     """
     Returns True if all terms have been matched.
     """
     nonlocal output
-    while line_number < len(normalized_root_text):
-      if index_within_line > len(normalized_root_text[line_number]) - len(normalized_terms[term_index]):
-        line_number += 1
-        index_within_line = 0
-        continue
-      if _is_match(line_number, index_within_line, normalized_terms[term_index]):
-        loc = (line_number, index_within_line, index_within_line + len(normalized_terms[term_index]) - 1)
-        if term_index > 0:
-          if loc == output[-1] and len(normalized_terms[term_index]) != len(normalized_terms[term_index-1]):
-            raise Exception(f"Terms of different lengths found at the same spot")
-          if output[-1][0] == loc[0] and output[-1][1] + len(normalized_terms[term_index-1]) - 1 > loc[1]:
-            raise Exception(f"I believe term {term_index} is partially overlapping the previous term. Already have {output}")
-        output.append(loc)
-        term_index += 1
-        if term_index == len(normalized_terms):
-          return True
-        # Don't increment index_within_line as some terms overlap
-        # unless the next is identical
-        skip_index = index_within_line+len(normalized_terms[term_index-1])
-        try:
-          if normalized_root_text[line_number][skip_index] == normalized_root_text[line_number][skip_index-1]:
-            index_within_line = skip_index
-          if normalized_root_text[line_number][skip_index] == 'v' and normalized_root_text[line_number][skip_index+1] == normalized_root_text[line_number][skip_index-1]:
-            index_within_line = skip_index+1
-        except IndexError:
-          pass
-        continue
-      index_within_line += 1
-    return False
+    while True:
+      found = root_text.find(normalized_terms[term_index], line_number, index_within_line)
+      if found is None:
+        return False
+      line_number, index_within_line = found
+      loc = (line_number, index_within_line, index_within_line + len(normalized_terms[term_index]) - 1)
+      if term_index > 0:
+        if loc == output[-1] and len(normalized_terms[term_index]) != len(normalized_terms[term_index-1]):
+          raise Exception(f"Terms of different lengths found at the same spot")
+        if output[-1][0] == loc[0] and output[-1][1] + len(normalized_terms[term_index-1]) - 1 > loc[1]:
+          raise Exception(f"I believe term {term_index} is partially overlapping the previous term. Already have {output}")
+      output.append(loc)
+      term_index += 1
+      if term_index == len(normalized_terms):
+        return True
+      # Don't increment index_within_line as some terms overlap
+      # unless the next is identical
+      skip_index = index_within_line+len(normalized_terms[term_index-1])
+      try:
+        if normalized_root_text[line_number][skip_index] == normalized_root_text[line_number][skip_index-1]:
+          index_within_line = skip_index
+        if normalized_root_text[line_number][skip_index] == 'v' and normalized_root_text[line_number][skip_index+1] == normalized_root_text[line_number][skip_index-1]:
+          index_within_line = skip_index+1
+      except IndexError:
+        pass
   line_number = 0
   index_within_line = 0
   term_index = 0
@@ -218,3 +385,167 @@ def match_terms_to_root_text(terms: list[list[str]], root_text: list[list[str]])
   {normalized_root_text}
 
   """)    
+
+# Within a worker, consecutive jobs often share a root text. The key is
+# a frozen copy so that a list edited in place between jobs isn't missed.
+_last_root_text_index: Optional[RootTextIndex] = None
+_last_root_text_key: Optional[tuple[tuple[str, ...], ...]] = None
+
+def _init_alignment_worker(term_normalizations: Optional[Path]):
+  """Process pool initializer. Importing this module has already built
+  the stemming tables, so just load the saved term normalizations."""
+  if term_normalizations is not None:
+    load_term_normalizations(term_normalizations)
+
+def _match_job(job: tuple[Hashable, list[list[str]], list[list[str]]]):
+  global _last_root_text_key, _last_root_text_index
+  rule_id, terms, root_text = job
+  try:
+    key = tuple(map(tuple, root_text))
+    if key != _last_root_text_key:
+      _last_root_text_index = RootTextIndex(root_text)
+      _last_root_text_key = key
+    return rule_id, match_terms_to_root_text(terms, _last_root_text_index)
+  except Exception as e:
+    return rule_id, e
+
+def match_terms_to_root_texts(
+  jobs: Iterable[tuple[Hashable, list[list[str]], list[list[str]]]],
+  workers: Optional[int] = None,
+  term_normalizations: Optional[Path] = None,
+) -> Iterator[tuple[Hashable, Union[list[tuple[int, int, int]], Exception]]]:
+  """
+  Runs match_terms_to_root_text on many rules across a pool of processes.
+  Args:
+    jobs: (rule_id, terms, root_text) for each rule
+    workers: How many processes to use (default: one per CPU)
+      With 1, runs everything in this process instead.
+    term_normalizations: A file from save_term_normalizations for
+      each worker to load when it starts
+  Yields:
+    (rule_id, result) for each job, in the order of jobs, as soon as that
+    job and those before it have finished. result is whatever
+    match_terms_to_root_text returned or the Exception it raised.
+  """
+  global _last_root_text_key, _last_root_text_index
+  workers = workers or os.cpu_count() or 1
+  if workers == 1:
+    _init_alignment_worker(term_normalizations)
+    try:
+      for job in jobs:
+        yield _match_job(job)
+    finally:
+      # Don't keep the caller's data alive
+      _last_root_text_key = _last_root_text_index = None
+    return
+  with ProcessPoolExecutor(
+    max_workers=workers,
+    initializer=_init_alignment_worker,
+    initargs=(term_normalizations,),
+  ) as executor:
+    # Keep a bounded number of jobs in flight so results can stream
+    # without reading all of jobs up front
+    in_flight = deque()
+    for job in jobs:
+      in_flight.append(executor.submit(_match_job, job))
+      if len(in_flight) >= 4 * workers:
+        yield in_flight.popleft().result()
+    while in_flight:
+      yield in_flight.popleft().result()
+
+# Self-checks
+if __name__ == '__main__':
+  import random
+
+  def _match_or_error(terms, root_text):
+    try:
+      return match_terms_to_root_text(terms, root_text)
+    except Exception as e:
+      return str(e)
+
+  class _LinearRootText(RootTextIndex):
+    """Finds terms by trying every position in turn, without the index"""
+    def find(self, term, line_number, index_within_line):
+      while line_number < len(self.lines):
+        if index_within_line > len(self.lines[line_number]) - len(term):
+          line_number += 1
+          index_within_line = 0
+          continue
+        if self.is_match(line_number, index_within_line, term):
+          return (line_number, index_within_line)
+        index_within_line += 1
+      return None
+
+  print("\n--- Testing matching against a RootTextIndex ---")
+  root_text = [['Yo', 'pana', 'bhikkhu', 'asantaṁ', 'uttarimanussadhammaṁ'], ['Bhikkhunī', 'nāma']]
+  terms = [['Yo', 'panāti'], ['bhikkhu', 'nāma'], ['Asantaṁ', 'nāma', 'bhikkhuṁ']]
+  assert match_terms_to_root_text(terms, root_text) == [(0, 0, 1), (0, 2, 2), (0, 3, 3)]
+  assert match_terms_to_root_text(terms, RootTextIndex(root_text)) == [(0, 0, 1), (0, 2, 2), (0, 3, 3)]
+  print('✅ A RootTextIndex matches the same as the list it was built from -> OK')
+  # 'asantaṁ' stems to 'asant', which is only found once the 'a' is dropped
+  retry_root_text = [['Yo', 'pana', 'bhikkhu', 'santaṁ']]
+  retry_terms = [['Yo', 'panāti'], ['asantaṁ']]
+  assert match_terms_to_root_text(retry_terms, retry_root_text) == [(0, 0, 1), (0, 3, 3)]
+  assert match_terms_to_root_text(retry_terms, RootTextIndex(retry_root_text)) == [(0, 0, 1), (0, 3, 3)]
+  print("✅ Both retry without an 'a' prefix -> OK")
+
+  rng = random.Random(0)
+  words = ['bhikkhu', 'bhikkhunī', 'pana', 'saṅghādisesa', 'āpatti', 'antarā', 'gāmaṁ', 'kho', 'aññatra', 'santaṁ', 'asantaṁ', 'cīvaraṁ', 'nāma']
+  for _ in range(500):
+    lines = [[rng.choice(words) for _ in range(rng.randrange(1, 8))] for _ in range(rng.randrange(1, 5))]
+    terms = []
+    for line in lines:
+      if rng.random() < 0.7:
+        start = rng.randrange(len(line))
+        terms.append(line[start:start + rng.randrange(1, 3)])
+    if rng.random() < 0.2:
+      terms.append([rng.choice(words)])
+    expected = _match_or_error(terms, _LinearRootText(lines))
+    index = RootTextIndex(lines)
+    assert _match_or_error(terms, lines) == expected, (terms, lines)
+    assert _match_or_error(terms, index) == expected, (terms, lines)
+    assert _match_or_error(terms, index) == expected, (terms, lines) # reusing the index
+  print('✅ Random terms match the same as a linear scan, given a list or a RootTextIndex -> OK')
+
+  print("\n--- Testing sanitize ---")
+  def _reference_sanitize(text, lower=True):
+    """sanitize as it was, filtering against the alphabet lists"""
+    valids = PALI_ALPHABET_WITH_CAPS
+    if lower:
+      text = text.lower()
+      valids = PALI_ALPHABET
+    return ''.join(filter(valids.__contains__, normalize(text)))
+  characters = [c for c in PALI_ALPHABET_WITH_CAPS if len(c) == 1] + [
+    'ṃ', 'Ṃ', '\u0304', '\u0323', '\u0307', '\u0303', 'a\u0304', 'N\u0303',
+    'x', 'é', 'ß', '—', '“', '.', ',', ' ', '\n', '\r\n', '0',
+  ]
+  for _ in range(10000):
+    words = [''.join(rng.choice(characters) for _ in range(rng.randrange(0, 10))) for _ in range(rng.randrange(0, 6))]
+    for lower in (True, False):
+      expected = [_reference_sanitize(word, lower) for word in words]
+      assert [sanitize(word, lower) for word in words] == expected, (words, lower)
+      assert sanitize_many(words, lower) == expected, (words, lower)
+  print('✅ sanitize and sanitize_many keep exactly what the alphabet lists allow -> OK')
+
+  print("\n--- Testing stem ---")
+  def _reference_stem(word):
+    """stem as it was, trying each group's length in turn"""
+    word = word.lower()
+    for i, group in enumerate(PALI_SUFFIXES):
+      n = len(PALI_SUFFIXES) - i
+      if word[-n:] in group:
+        return word[:-n]
+    return word
+  suffixes = [suffix for group in PALI_SUFFIXES for suffix in group]
+  for suffix in suffixes:
+    for word in (suffix, 'bhikkh' + suffix, 'a' + suffix, suffix[1:], suffix.upper()):
+      assert stem(word) == _reference_stem(word), word
+  letters = PALI_ALPHABET + PALI_CAPS
+  for _ in range(20000):
+    word = ''.join(rng.choice(letters) for _ in range(rng.randrange(0, 5)))
+    if rng.random() < 0.7:
+      word += rng.choice(suffixes)
+    assert stem(word) == _reference_stem(word), word
+  print('✅ The suffix trie strips the same suffixes as trying each group in turn -> OK')
+
+  print("\nAll tests completed.")